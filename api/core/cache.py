@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+
+class _Flight:
+    """One in-progress computation that concurrent misses on the same key wait for."""
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResultCache:
+    """
+    In-process read-through cache with a size bound, a TTL and LRU eviction.
+
+    invalidate() bumps a version: entries and in-flight computations started under an older
+    version are never served afterwards. discard() drops individual entries. Concurrent misses on a key share one computation
+    (single-flight), so a cold cache costs one query per key rather than one per caller.
+
+    Invalidation is per process; writes made by other processes are picked up when the TTL
+    expires. A compute result of None is returned but not stored.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[int, float, Any]]" = OrderedDict()
+        self._flights: dict[tuple[int, Hashable], _Flight] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 and self._ttl > 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def discard(self, keys: Iterable[Hashable]) -> None:
+        """Drop the entries for `keys`, leaving the rest of the cache in place."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def get(self, key: Hashable) -> Any:
+        """The live entry for `key`, or None; for callers that look up and fill in bulk."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            version, expires_at, value = entry
+            if version != self._version or expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.enabled or value is None:
+            return
+        with self._lock:
+            self._entries[key] = (self._version, time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return compute()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, expires_at, value = entry
+                if version == self._version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+            version = self._version
+            flight = self._flights.get((version, key))
+            leader = flight is None
+            if leader:
+                flight = self._flights[(version, key)] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop((version, key), None)
+                # a result computed across an invalidation may predate the write; don't keep it
+                if flight.error is None and flight.value is not None and version == self._version:
+                    self._entries[key] = (version, time.monotonic() + self._ttl, flight.value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self._max_entries:
+                        self._entries.popitem(last=False)
+            flight.done.set()
+        return flight.value
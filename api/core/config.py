@@ -38,6 +38,43 @@ class Settings(BaseSettings):
     DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "3600"))  # 1 hour
     DB_POOL_TIMEOUT_SECONDS: int = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
 
+    # Ingest settings
+    INGEST_BULK_THRESHOLD: int = int(os.getenv("INGEST_BULK_THRESHOLD", "50"))  # rows; COPY-based path at or above
+    INGEST_TX_CHUNK_SIZE: int = int(os.getenv("INGEST_TX_CHUNK_SIZE", "1000"))  # rows per transaction on the row-by-row path
+    INGEST_STREAM_CHUNK_SIZE: int = int(os.getenv("INGEST_STREAM_CHUNK_SIZE", "500"))  # rows committed per streamed chunk
+    INGEST_JOB_CHUNK_SIZE: int = int(os.getenv("INGEST_JOB_CHUNK_SIZE", "500"))  # rows committed per worker step
+    INGEST_JOB_MAX_ATTEMPTS: int = int(os.getenv("INGEST_JOB_MAX_ATTEMPTS", "3"))
+    INGEST_JOB_STALE_SECONDS: int = int(os.getenv("INGEST_JOB_STALE_SECONDS", "300"))  # reclaim running jobs without heartbeat
+    INGEST_IDEMPOTENCY_TTL_HOURS: int = int(os.getenv("INGEST_IDEMPOTENCY_TTL_HOURS", "24"))
+    INGEST_WORKER_POLL_SECONDS: float = float(os.getenv("INGEST_WORKER_POLL_SECONDS", "2"))
+
+    # Listing reads
+    LISTINGS_STREAM_BATCH_SIZE: int = int(os.getenv("LISTINGS_STREAM_BATCH_SIZE", "1000"))  # rows per server-side cursor fetch
+    LISTINGS_CACHE_MAX_ENTRIES: int = int(os.getenv("LISTINGS_CACHE_MAX_ENTRIES", "32"))  # cached listing pages per process; 0 disables
+    LISTINGS_CACHE_TTL_SECONDS: int = int(os.getenv("LISTINGS_CACHE_TTL_SECONDS", "30"))
+    LISTINGS_TOUCH_INTERVAL_SECONDS: int = int(os.getenv("LISTINGS_TOUCH_INTERVAL_SECONDS", "3600"))  # min age of last_seen_at before a re-sent row is touched
+    KPI_ETAG_MAX_AGE_SECONDS: int = int(os.getenv("KPI_ETAG_MAX_AGE_SECONDS", "60"))  # KPIs depend on now(); ETag rolls over at least this often, 0 disables it
+
+    # Scoring
+    SCORE_BATCH_THRESHOLD: int = int(os.getenv("SCORE_BATCH_THRESHOLD", "256"))  # items; vectorized scoring at or above (needs numpy)
+    SCORING_MODELS_PATH: str = os.getenv("SCORING_MODELS_PATH", "")  # default: scoring_models.json at the repo root
+    SCORING_MODELS_RELOAD_SECONDS: float = float(os.getenv("SCORING_MODELS_RELOAD_SECONDS", "5"))  # how often the file mtime is checked
+    SCORE_MEMO_MAX_ENTRIES: int = int(os.getenv("SCORE_MEMO_MAX_ENTRIES", "100000"))  # latest scored inputs per VIN kept in process; 0 disables
+    SCORE_MEMO_TTL_SECONDS: int = int(os.getenv("SCORE_MEMO_TTL_SECONDS", "300"))  # bounds staleness against scores written by other processes
+
+    # Rescoring (api.jobs.rescore)
+    RESCORE_CHUNK_SIZE: int = int(os.getenv("RESCORE_CHUNK_SIZE", "5000"))  # listing ids walked per step
+    RESCORE_ACTIVE_DAYS: int = int(os.getenv("RESCORE_ACTIVE_DAYS", "30"))  # listings seen within this many days are active
+    RESCORE_MAX_SECONDS: int = int(os.getenv("RESCORE_MAX_SECONDS", "900"))  # per run; the next run resumes where it stopped
+    RESCORE_INTERVAL_SECONDS: int = int(os.getenv("RESCORE_INTERVAL_SECONDS", "0"))  # in-process schedule for the API; 0 disables
+
+    # Price comparables (api.jobs.price_comparables)
+    PRICE_COMPARABLES_MILES_BAND: int = int(os.getenv("PRICE_COMPARABLES_MILES_BAND", "25000"))  # miles per mileage band
+    PRICE_COMPARABLES_WINDOW_DAYS: int = int(os.getenv("PRICE_COMPARABLES_WINDOW_DAYS", "90"))  # listings seen within this many days count
+    PRICE_COMPARABLES_MIN_SAMPLES: int = int(os.getenv("PRICE_COMPARABLES_MIN_SAMPLES", "5"))  # smaller groups fall back to the flat pivot
+    PRICE_COMPARABLES_RELOAD_SECONDS: int = int(os.getenv("PRICE_COMPARABLES_RELOAD_SECONDS", "300"))  # in-memory lookup refresh
+    PRICE_COMPARABLES_REFRESH_SECONDS: int = int(os.getenv("PRICE_COMPARABLES_REFRESH_SECONDS", "0"))  # in-process schedule for the API; 0 disables
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
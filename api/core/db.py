@@ -117,6 +117,159 @@ def _exec_sql_script(cur: "psycopg.Cursor", script: str) -> None:
         cur.execute(stmt)
 
 
+def _ensure_scores_latest_trigger(cur: "psycopg.Cursor") -> None:
+    """
+    Keep scores_latest current from every INSERT into scores, in the inserting statement.
+
+    The trigger is statement-level with a transition table, so a bulk insert costs one upsert
+    rather than one per row. The WHERE guard keeps the row with the newest (created_at, id),
+    matching the DISTINCT ON (vin) ... ORDER BY created_at DESC it replaces, even when
+    transactions commit out of order.
+    """
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION public.scores_latest_sync() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO public.scores_latest AS cur (vin, vehicle_key, score, buy_max, reason_codes, created_at, score_id,
+                                                     model_version, price, miles, dom, pivot)
+            SELECT DISTINCT ON (vin) vin, vehicle_key, score, buy_max, reason_codes, created_at, id,
+                   model_version, price, miles, dom, pivot
+              FROM new_scores
+             WHERE vin IS NOT NULL
+             ORDER BY vin, created_at DESC, id DESC
+            ON CONFLICT (vin) DO UPDATE
+               SET vehicle_key = EXCLUDED.vehicle_key,
+                   score = EXCLUDED.score,
+                   buy_max = EXCLUDED.buy_max,
+                   reason_codes = EXCLUDED.reason_codes,
+                   created_at = EXCLUDED.created_at,
+                   score_id = EXCLUDED.score_id,
+                   model_version = EXCLUDED.model_version,
+                   price = EXCLUDED.price,
+                   miles = EXCLUDED.miles,
+                   dom = EXCLUDED.dom,
+                   pivot = EXCLUDED.pivot
+             WHERE (cur.created_at, cur.score_id) <= (EXCLUDED.created_at, EXCLUDED.score_id);
+            RETURN NULL;
+        END $$;
+    """)
+    # Created only when missing: dropping and re-creating would open a window in which
+    # concurrent inserts bypass the trigger.
+    cur.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger
+                 WHERE tgname = 'scores_latest_sync'
+                   AND tgrelid = 'public.scores'::regclass
+            ) THEN
+                CREATE TRIGGER scores_latest_sync
+                    AFTER INSERT ON public.scores
+                    REFERENCING NEW TABLE AS new_scores
+                    FOR EACH STATEMENT EXECUTE FUNCTION public.scores_latest_sync();
+            END IF;
+        END $$;
+    """)
+    # Backfill from existing history once; the trigger covers everything inserted since it exists.
+    # Marker and backfill commit together, so an interrupted backfill is retried on next boot.
+    with cur.connection.transaction():
+        cur.execute("""
+            INSERT INTO public.schema_migrations (name) VALUES ('scores_latest_backfill')
+            ON CONFLICT (name) DO NOTHING
+            RETURNING name
+        """)
+        if cur.fetchone():
+            logger.info("Backfilling scores_latest from scores...")
+            cur.execute("""
+                INSERT INTO public.scores_latest (vin, vehicle_key, score, buy_max, reason_codes, created_at, score_id)
+                SELECT DISTINCT ON (vin) vin, vehicle_key, score, buy_max, reason_codes, created_at, id
+                  FROM public.scores
+                 WHERE vin IS NOT NULL
+                 ORDER BY vin, created_at DESC, id DESC
+                ON CONFLICT (vin) DO NOTHING
+            """)
+
+
+def _backfill_listing_decision_columns(cur: "psycopg.Cursor", batch_size: int = 10000) -> None:
+    """
+    Copy status/buyMax/reasonCodes out of listings.payload into their typed columns, once.
+
+    Runs in id ranges of `batch_size`, each committed on its own, so no long transaction holds
+    row locks against ingest. Re-running is idempotent: rows whose columns are set are skipped,
+    and the marker is written only after the last batch.
+    """
+    cur.execute("SELECT 1 FROM public.schema_migrations WHERE name = 'listings_decision_columns'")
+    if cur.fetchone():
+        return
+    cur.execute("SELECT COALESCE(MAX(id), 0) FROM public.listings")
+    max_id = cur.fetchone()[0]
+    logger.info("Backfilling listings decision columns up to id %s...", max_id)
+    for start in range(0, max_id, batch_size):
+        cur.execute("""
+            UPDATE public.listings
+               SET status = payload->>'status',
+                   decision_buy_max = CASE WHEN jsonb_typeof(payload->'buyMax') = 'number'
+                                           THEN (payload->>'buyMax')::numeric END,
+                   decision_reasons = CASE WHEN jsonb_typeof(payload->'reasonCodes') = 'array'
+                                           THEN ARRAY(SELECT jsonb_array_elements_text(payload->'reasonCodes')) END
+             WHERE id > %s AND id <= %s
+               AND payload IS NOT NULL
+               AND status IS NULL AND decision_buy_max IS NULL AND decision_reasons IS NULL
+               AND (payload->>'status' IS NOT NULL
+                    OR jsonb_typeof(payload->'buyMax') = 'number'
+                    OR jsonb_typeof(payload->'reasonCodes') = 'array')
+        """, (start, start + batch_size))
+    cur.execute("INSERT INTO public.schema_migrations (name) VALUES ('listings_decision_columns') ON CONFLICT (name) DO NOTHING")
+
+
+# Columns whose updates change what readers see. Listings leave out last_seen_at and content_hash
+# (touched on every re-ingest of an unchanged row) and the decision columns derived from payload.
+_DATA_VERSION_UPDATE_COLUMNS = {
+    "listings": ("vehicle_key", "vin", "source", "price", "miles", "dom", "location", "buyer_id", "payload", "created_at"),
+}
+
+
+def _ensure_data_version_triggers(cur: "psycopg.Cursor") -> None:
+    """
+    Bump data_versions after every statement that writes a table listing/KPI reads depend on.
+
+    Statement-level, so a bulk insert bumps once. The bump is part of the writing transaction,
+    so the version only moves once the data it covers is committed and visible. Tables in
+    _DATA_VERSION_UPDATE_COLUMNS only bump on updates of those columns; an older trigger without
+    that column list is replaced.
+    """
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION public.data_version_bump() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO public.data_versions AS dv (shard, version) VALUES (pg_backend_pid() % 16, 1)
+            ON CONFLICT (shard) DO UPDATE SET version = dv.version + 1;
+            RETURN NULL;
+        END $$;
+    """)
+    for table in ("listings", "scores", "vehicles", "users"):
+        columns = _DATA_VERSION_UPDATE_COLUMNS.get(table)
+        update = f"UPDATE OF {', '.join(columns)}" if columns else "UPDATE"
+        # tgattr is empty for a trigger without a column list
+        current = "cardinality(tgattr::int2[]) > 0" if columns else "true"
+        cur.execute(f"""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (
+                    SELECT 1 FROM pg_trigger
+                     WHERE tgname = 'data_version_bump'
+                       AND tgrelid = 'public.{table}'::regclass
+                       AND {current}
+                ) THEN
+                    DROP TRIGGER IF EXISTS data_version_bump ON public.{table};
+                    CREATE TRIGGER data_version_bump
+                        AFTER INSERT OR {update} OR DELETE OR TRUNCATE ON public.{table}
+                        FOR EACH STATEMENT EXECUTE FUNCTION public.data_version_bump();
+                END IF;
+            END $$;
+        """)
+
+
 def apply_schema_if_needed() -> None:
     """Create/alter fundamental tables/columns and seed defaults, idempotently."""
     if not DB_ENABLED:
@@ -148,6 +301,17 @@ def apply_schema_if_needed() -> None:
                     # ADD COLUMN IF NOT EXISTS is valid on PG >= 9.6
                     cur.execute("ALTER TABLE public.listings ADD COLUMN IF NOT EXISTS location text")
                     cur.execute("ALTER TABLE public.listings ADD COLUMN IF NOT EXISTS buyer_id text")
+                    cur.execute("ALTER TABLE public.listings ADD COLUMN IF NOT EXISTS content_hash text")
+                    cur.execute("ALTER TABLE public.listings ADD COLUMN IF NOT EXISTS last_seen_at timestamptz DEFAULT now()")
+                    cur.execute("ALTER TABLE public.listings ADD COLUMN IF NOT EXISTS status text")
+                    cur.execute("ALTER TABLE public.listings ADD COLUMN IF NOT EXISTS decision_buy_max numeric")
+                    cur.execute("ALTER TABLE public.listings ADD COLUMN IF NOT EXISTS decision_reasons text[]")
+                    # Re-sent listings are detected by content hash; legacy rows keep NULL (never conflicts)
+                    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_listings_content_hash ON public.listings(content_hash)")
+                    cur.execute("CREATE INDEX IF NOT EXISTS idx_listings_buyer_created ON public.listings(buyer_id, created_at DESC, id DESC)")
+                    # status filters use the typed column; the old index was on payload->>'status'
+                    cur.execute("DROP INDEX IF EXISTS public.idx_listings_status")
+                    cur.execute("CREATE INDEX IF NOT EXISTS idx_listings_status_created ON public.listings(status, created_at DESC, id DESC)")
 
                     # Backfill buyer_id from legacy 'buyer' if present
                     cur.execute("""
@@ -167,9 +331,38 @@ def apply_schema_if_needed() -> None:
                         END $$;
                     """)
 
+                    if _table_exists(cur, "public.schema_migrations"):
+                        _backfill_listing_decision_columns(cur)
+
                 else:
                     logger.warning("Skipping ALTERs for listings: table does not exist yet")
 
+                # ----- scores columns -----
+                if _table_exists(cur, "public.scores"):
+                    cur.execute("ALTER TABLE public.scores ADD COLUMN IF NOT EXISTS model_version text")
+                    cur.execute("ALTER TABLE public.scores ADD COLUMN IF NOT EXISTS price numeric")
+                    cur.execute("ALTER TABLE public.scores ADD COLUMN IF NOT EXISTS miles int")
+                    cur.execute("ALTER TABLE public.scores ADD COLUMN IF NOT EXISTS dom int")
+                    cur.execute("ALTER TABLE public.scores ADD COLUMN IF NOT EXISTS pivot double precision")
+
+                # ----- scores_latest maintenance -----
+                if _table_exists(cur, "public.scores_latest"):
+                    # scored inputs, compared by the /api/score memo (see get_memoized_scores)
+                    cur.execute("ALTER TABLE public.scores_latest ADD COLUMN IF NOT EXISTS model_version text")
+                    cur.execute("ALTER TABLE public.scores_latest ADD COLUMN IF NOT EXISTS price numeric")
+                    cur.execute("ALTER TABLE public.scores_latest ADD COLUMN IF NOT EXISTS miles int")
+                    cur.execute("ALTER TABLE public.scores_latest ADD COLUMN IF NOT EXISTS dom int")
+                    cur.execute("ALTER TABLE public.scores_latest ADD COLUMN IF NOT EXISTS pivot double precision")
+                    _ensure_scores_latest_trigger(cur)
+
+                # ----- data version counter (ETags) -----
+                if _table_exists(cur, "public.data_versions"):
+                    _ensure_data_version_triggers(cur)
+
+                # ----- ingest_jobs columns -----
+                if _table_exists(cur, "public.ingest_jobs"):
+                    cur.execute("ALTER TABLE public.ingest_jobs ADD COLUMN IF NOT EXISTS score boolean NOT NULL DEFAULT false")
+
                 # ----- users.username column -----
                 if _table_exists(cur, "public.users"):
                     cur.execute("ALTER TABLE public.users ADD COLUMN IF NOT EXISTS username text")
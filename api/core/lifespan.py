@@ -1,12 +1,14 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import logging
+from .config import settings
 from .db import DB_ENABLED, apply_schema_if_needed
 from .connection_pool import initialize_pool, close_pool
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logging.basicConfig(level=logging.INFO)
+    scheduled = []
     if DB_ENABLED:
         try:
             logging.info("Lifespan start: initializing connection pool…")
@@ -16,12 +18,24 @@ async def lifespan(app: FastAPI):
             logging.info("Lifespan: schema ready")
         except Exception:
             logging.exception("Schema bootstrap failed")
+        # every API process schedules the jobs; their advisory locks let one process run each
+        from ..jobs.scheduler import start_scheduler
+        if settings.PRICE_COMPARABLES_REFRESH_SECONDS > 0:
+            from ..jobs import price_comparables
+            scheduled.append(start_scheduler("price-comparables", price_comparables.run, settings.PRICE_COMPARABLES_REFRESH_SECONDS))
+            logging.info("Lifespan: refreshing price comparables every %ss", settings.PRICE_COMPARABLES_REFRESH_SECONDS)
+        if settings.RESCORE_INTERVAL_SECONDS > 0:
+            from ..jobs import rescore
+            scheduled.append(start_scheduler("rescore", rescore.run, settings.RESCORE_INTERVAL_SECONDS))
+            logging.info("Lifespan: rescoring every %ss", settings.RESCORE_INTERVAL_SECONDS)
     else:
         logging.warning("DB is disabled; running in in-memory mode")
     
     yield
     
     # Cleanup on shutdown
+    for stop in scheduled:
+        stop.set()
     if DB_ENABLED:
         try:
             logging.info("Lifespan end: closing connection pool…")
@@ -0,0 +1,75 @@
+"""
+Refresh of the price_comparables table.
+
+The scorer's PriceVsBaseline pivot is the median price of comparable listings: same make, model
+and year, same PRICE_COMPARABLES_MILES_BAND mileage band, newest listing per vehicle, seen in the
+last PRICE_COMPARABLES_WINDOW_DAYS.
+
+    python -m api.jobs.price_comparables          # groups with listings since the last run
+    python -m api.jobs.price_comparables --full   # rebuild every group
+
+or in-process from the API by setting PRICE_COMPARABLES_REFRESH_SECONDS (see api.jobs.scheduler).
+
+An incremental run reads only the listings added since the watermark stored in job_cursors to
+find the (make, model, year) groups they touch, and rebuilds just those groups. Groups without
+new listings keep their numbers while their older listings age out of the window until a
+periodic --full run rebuilds them. Runs take an advisory lock like api.jobs.rescore, so
+concurrent schedulers do not duplicate work.
+"""
+import argparse
+import logging
+import time
+from typing import Optional
+from ..core.config import settings
+from ..core.db import DB_ENABLED, apply_schema_if_needed
+from ..repositories.jobs import advisory_lock, get_job_cursor, set_job_cursor
+from ..repositories.price_comparables import refresh_price_comparables
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "price_comparables"
+# pg_try_advisory_lock key; any constant unique among this database's advisory locks
+PRICE_COMPARABLES_LOCK_KEY = 0x5052_4943  # "PRIC"
+
+
+def run(full: bool = False) -> Optional[dict]:
+    """Refresh touched groups (all of them with `full`). Returns the run's counts, or None when another process holds the lock."""
+    started = time.monotonic()
+    stats: Optional[dict] = None
+    error: Optional[Exception] = None
+    with advisory_lock(PRICE_COMPARABLES_LOCK_KEY) as locked:
+        if not locked:
+            logger.info("Price comparables refresh skipped: another process holds the lock")
+        else:
+            try:
+                after_id = 0 if full else get_job_cursor(JOB_NAME)
+                upto, touched, written = refresh_price_comparables(
+                    after_id, settings.PRICE_COMPARABLES_MILES_BAND, settings.PRICE_COMPARABLES_WINDOW_DAYS,
+                )
+                set_job_cursor(JOB_NAME, upto)
+                stats = {"from_id": after_id, "to_id": upto, "groups": touched, "rows": written}
+            except Exception as e:
+                logger.error("Price comparables refresh failed: %s", e, exc_info=True)
+                error = e
+    if error is not None:
+        raise error
+    if stats is not None:
+        logger.info("Price comparables: ids %d..%d, %d groups rebuilt into %d rows in %.1fs",
+                    stats["from_id"], stats["to_id"], stats["groups"], stats["rows"], time.monotonic() - started)
+    return stats
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Refresh price comparables from recent listings")
+    parser.add_argument("--full", action="store_true", help="rebuild every group, not only those with new listings")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if not DB_ENABLED:
+        raise SystemExit("DATABASE_URL is not configured")
+    apply_schema_if_needed()
+    run(full=args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Rescoring of active inventory.
+
+dom is stored as of ingest, so AgedInventory and the aged buy-max cut go stale as listings sit.
+This job rescores the newest listing of every vehicle seen in the last RESCORE_ACTIVE_DAYS with
+its effective dom (ingested dom + whole days since created_at) under the live scoring model:
+
+    python -m api.jobs.rescore                    # one run
+    python -m api.jobs.rescore --max-seconds 600  # stop early; the next run resumes
+
+or in-process from the API by setting RESCORE_INTERVAL_SECONDS (see api.jobs.scheduler).
+
+Listings are walked by id in RESCORE_CHUNK_SIZE chunks; each chunk is one read, one vectorized
+scoring pass and, for the scores whose result, model or price baseline changed, one COPY. A
+Postgres advisory lock lets any number of processes schedule the job while only one runs it.
+The last committed id is stored in job_cursors, so a run that hits RESCORE_MAX_SECONDS, or
+crashes, is picked up by the next run; a completed walk starts over from the first listing.
+"""
+import argparse
+import datetime
+import logging
+import time
+from typing import List, Optional
+from ..core.config import settings
+from ..core.db import DB_ENABLED, apply_schema_if_needed
+from ..repositories.repositories import ScoreRow, insert_scores_bulk
+from ..repositories.jobs import advisory_lock, get_job_cursor, set_job_cursor
+from ..repositories.rescore import RescoreRow, fetch_rescore_chunk
+from ..schemas.listing import ListingScoreIn
+from ..services.batch_scoring import score_batch
+from ..services.scoring_models import ScoringModel, scoring_models
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "rescore"
+# pg_try_advisory_lock key; any constant unique among this database's advisory locks
+RESCORE_LOCK_KEY = 0x5245_5343  # "RESC"
+
+
+def rescore_rows(rows: List[RescoreRow], model: ScoringModel) -> List[ScoreRow]:
+    """Scores rows under `model`, keeping those whose result, model or price baseline differs from their latest score."""
+    items = [
+        ListingScoreIn.model_construct(
+            vehicle_key=vehicle_key, vin=vin, price=price, miles=miles, dom=dom, source=source,
+            year=year, make=make, model=model_name,
+        )
+        for _, vehicle_key, vin, price, miles, dom, source, year, make, model_name, *_ in rows
+    ]
+    changed: List[ScoreRow] = []
+    for row, item, (score_val, buy_max, reasons) in zip(rows, items, score_batch(items, model)):
+        _, vehicle_key, vin, price, miles, dom, *_, model_version, old_score, old_buy_max, old_reasons, old_pivot = row
+        pivot = model.pivot(item)
+        if (model_version, old_score, old_buy_max, old_reasons, old_pivot) != (model.version, score_val, buy_max, reasons, pivot):
+            changed.append((vehicle_key, vin, score_val, buy_max, reasons, model.version, price, miles, dom, pivot))
+    return changed
+
+
+def _walk(chunk_size: int, deadline: float) -> dict:
+    model = scoring_models.live()
+    as_of = datetime.datetime.now(datetime.timezone.utc)
+    active_since = as_of - datetime.timedelta(days=settings.RESCORE_ACTIVE_DAYS)
+    cursor = get_job_cursor(JOB_NAME)
+    stats = {"model_version": model.version, "from_id": cursor, "scanned": 0, "changed": 0, "complete": False}
+
+    while time.monotonic() < deadline:
+        last_id, rows = fetch_rescore_chunk(cursor, chunk_size, as_of, active_since)
+        if last_id == cursor:
+            stats["complete"] = True
+            break
+        changed = rescore_rows(rows, model)
+        insert_scores_bulk(changed)
+        cursor = last_id
+        set_job_cursor(JOB_NAME, cursor)
+        stats["scanned"] += len(rows)
+        stats["changed"] += len(changed)
+
+    stats["to_id"] = cursor
+    if stats["complete"]:
+        set_job_cursor(JOB_NAME, 0)
+    return stats
+
+
+def run(chunk_size: Optional[int] = None, max_seconds: Optional[float] = None) -> Optional[dict]:
+    """
+    Rescore until the walk completes or `max_seconds` pass. Returns the run's counts, or None
+    when another process holds the lock.
+    """
+    chunk_size = chunk_size or settings.RESCORE_CHUNK_SIZE
+    max_seconds = settings.RESCORE_MAX_SECONDS if max_seconds is None else max_seconds
+    started = time.monotonic()
+    stats: Optional[dict] = None
+    error: Optional[Exception] = None
+    with advisory_lock(RESCORE_LOCK_KEY) as locked:
+        if not locked:
+            logger.info("Rescore skipped: another process holds the lock")
+        else:
+            try:
+                stats = _walk(chunk_size, started + max_seconds)
+            except Exception as e:
+                logger.error("Rescore failed: %s", e, exc_info=True)
+                error = e
+    if error is not None:
+        raise error
+    if stats is not None:
+        logger.info("Rescore %s: %d scanned, %d changed, ids %d..%d in %.1fs (%s)",
+                    stats["model_version"], stats["scanned"], stats["changed"], stats["from_id"], stats["to_id"],
+                    time.monotonic() - started, "complete" if stats["complete"] else "resumes next run")
+    return stats
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rescore active listings with their current days on market")
+    parser.add_argument("--chunk-size", type=int, default=None, help="listing ids walked per step")
+    parser.add_argument("--max-seconds", type=float, default=None, help="stop after this long; the next run resumes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if not DB_ENABLED:
+        raise SystemExit("DATABASE_URL is not configured")
+    apply_schema_if_needed()
+    run(chunk_size=args.chunk_size, max_seconds=args.max_seconds)
+
+
+if __name__ == "__main__":
+    main()
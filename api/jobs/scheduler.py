@@ -0,0 +1,26 @@
+"""
+In-process scheduling of background jobs for the API (see core.lifespan).
+
+Every API process may schedule the same job: the jobs take a Postgres advisory lock, so only
+one process runs each of them at a time and the others skip that round.
+"""
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def start_scheduler(name: str, job: Callable[[], object], interval_seconds: float) -> threading.Event:
+    """Run `job` every `interval_seconds` on a daemon thread; set the returned event to stop it."""
+    stop = threading.Event()
+
+    def loop() -> None:
+        while not stop.wait(interval_seconds):
+            try:
+                job()
+            except Exception:
+                logger.exception("Scheduled %s failed", name)
+
+    threading.Thread(target=loop, name=f"{name}-scheduler", daemon=True).start()
+    return stop
@@ -0,0 +1,179 @@
+import json
+import logging
+from typing import List, Optional
+from uuid import UUID
+from ..core.db import DB_ENABLED
+from ..core.db_helpers import get_db_connection
+from ..schemas.ingest import IngestJobOut, IngestRowError
+from ..schemas.listing import ListingIn
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# Ingest job queue
+# -----------------------------------------------------------------------------
+
+def enqueue_ingest_job(rows: List[ListingIn], buyer_id: Optional[str] = None, score: bool = False) -> Optional[UUID]:
+    """Store a raw batch for the ingest workers and return the job id; `score` scores rows as they are ingested."""
+    if not DB_ENABLED:
+        return None
+
+    payload = json.dumps([row.model_dump(mode="json") for row in rows])
+    with get_db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    insert into ingest_jobs (buyer_id, payload, score, total)
+                    values (%s, %s, %s, %s)
+                    returning id
+                    """,
+                    (buyer_id, payload, score, len(rows)),
+                )
+                return cur.fetchone()[0]
+        except Exception as e:
+            logger.error("Error in enqueue_ingest_job: %s", e, exc_info=True)
+            return None
+
+def claim_ingest_job(worker: str, stale_after_seconds: int) -> Optional[dict]:
+    """
+    Claim the oldest queued job, or a running job whose worker stopped heartbeating.
+
+    FOR UPDATE SKIP LOCKED lets any number of workers poll concurrently without blocking
+    on, or double-claiming, a job another worker is in the middle of claiming.
+    """
+    if not DB_ENABLED:
+        return None
+
+    with get_db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    update ingest_jobs j
+                       set status = 'running',
+                           attempts = j.attempts + 1,
+                           worker = %s,
+                           started_at = coalesce(j.started_at, now()),
+                           heartbeat_at = now()
+                     where j.id = (
+                        select id from ingest_jobs
+                         where status = 'queued'
+                            or (status = 'running' and heartbeat_at < now() - make_interval(secs => %s))
+                         order by created_at
+                         for update skip locked
+                         limit 1
+                     )
+                    returning j.id, j.buyer_id, j.payload, j.score, j.processed, j.attempts
+                    """,
+                    (worker, stale_after_seconds),
+                )
+                row = cur.fetchone()
+                if not row:
+                    return None
+                job_id, buyer_id, payload, score, processed, attempts = row
+                return {
+                    "id": job_id,
+                    "buyer_id": buyer_id,
+                    "rows": json.loads(payload) if isinstance(payload, str) else payload,
+                    "score": score,
+                    "processed": processed,
+                    "attempts": attempts,
+                }
+        except Exception as e:
+            logger.error("Error in claim_ingest_job: %s", e, exc_info=True)
+            return None
+
+def record_ingest_job_progress(job_id: UUID, processed: int, accepted: int, errors: List[IngestRowError]) -> None:
+    """Advance a job's resume offset after a chunk committed, and append that chunk's row errors."""
+    if not DB_ENABLED:
+        return
+    with get_db_connection() as conn:
+        if not conn:
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    update ingest_jobs
+                       set processed = %s,
+                           accepted = accepted + %s,
+                           rejected = rejected + %s,
+                           errors = errors || %s::jsonb,
+                           heartbeat_at = now()
+                     where id = %s
+                    """,
+                    (
+                        processed, accepted, len(errors),
+                        json.dumps([e.model_dump(exclude_none=True) for e in errors]),
+                        job_id,
+                    ),
+                )
+        except Exception as e:
+            logger.error("Error in record_ingest_job_progress: %s", e, exc_info=True)
+
+def finish_ingest_job(job_id: UUID, error: Optional[str] = None) -> None:
+    """Mark a job done, or failed with `error`."""
+    if not DB_ENABLED:
+        return
+    with get_db_connection() as conn:
+        if not conn:
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    update ingest_jobs
+                       set status = %s, last_error = %s, finished_at = now(), heartbeat_at = now()
+                     where id = %s
+                    """,
+                    ("failed" if error else "done", error, job_id),
+                )
+        except Exception as e:
+            # the job stays running and is reclaimed once its heartbeat goes stale
+            logger.error("Error in finish_ingest_job: %s", e, exc_info=True)
+
+def get_ingest_job(job_id: UUID) -> Optional[tuple[IngestJobOut, Optional[str]]]:
+    """Return (job, buyer_id) for the status endpoint."""
+    if not DB_ENABLED:
+        return None
+    with get_db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    select id, status, total, processed, accepted, rejected, errors, attempts,
+                           last_error, created_at, started_at, finished_at, buyer_id
+                      from ingest_jobs
+                     where id = %s
+                    """,
+                    (job_id,),
+                )
+                row = cur.fetchone()
+                if not row:
+                    return None
+                errors = json.loads(row[6]) if isinstance(row[6], str) else row[6]
+                job = IngestJobOut(
+                    id=row[0],
+                    status=row[1],
+                    total=row[2],
+                    processed=row[3],
+                    accepted=row[4],
+                    rejected=row[5],
+                    errors=errors or [],
+                    attempts=row[7],
+                    last_error=row[8],
+                    created_at=row[9],
+                    started_at=row[10],
+                    finished_at=row[11],
+                )
+                return job, row[12]
+        except Exception as e:
+            logger.error("Error in get_ingest_job: %s", e, exc_info=True)
+            return None
@@ -0,0 +1,66 @@
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+from ..core.db import DB_ENABLED
+from ..core.db_helpers import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# Background job coordination: advisory locks and resume cursors
+# -----------------------------------------------------------------------------
+
+@contextmanager
+def advisory_lock(key: int) -> Iterator[bool]:
+    """
+    Hold a session-level Postgres advisory lock for the duration of the block.
+
+    Yields False without waiting when another session holds it (or without a database). The lock
+    lives on a pooled connection kept out of the pool until the block exits, and is released
+    with the session if the process dies. Exceptions must not escape the block: the pool's
+    context manager cannot re-raise them (see get_connection).
+    """
+    with get_db_connection() as conn:
+        if not conn:
+            yield False
+            return
+        with conn.cursor() as cur:
+            cur.execute("select pg_try_advisory_lock(%s)", (key,))
+            locked = cur.fetchone()[0]
+        try:
+            yield locked
+        finally:
+            if locked:
+                with conn.cursor() as cur:
+                    cur.execute("select pg_advisory_unlock(%s)", (key,))
+
+def get_job_cursor(name: str) -> int:
+    """Last id a job committed (job_cursors), 0 when it has none."""
+    if not DB_ENABLED:
+        return 0
+    with get_db_connection() as conn:
+        if not conn:
+            return 0
+        try:
+            with conn.cursor() as cur:
+                cur.execute("select last_id from job_cursors where name = %s", (name,))
+                row = cur.fetchone()
+                return row[0] if row else 0
+        except Exception as e:
+            logger.error("Error in get_job_cursor: %s", e, exc_info=True)
+            return 0
+
+def set_job_cursor(name: str, last_id: int) -> None:
+    if not DB_ENABLED:
+        return
+    with get_db_connection() as conn:
+        if not conn:
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    insert into job_cursors (name, last_id) values (%s, %s)
+                    on conflict (name) do update set last_id = excluded.last_id, updated_at = now()
+                """, (name, last_id))
+        except Exception as e:
+            logger.error("Error in set_job_cursor: %s", e, exc_info=True)
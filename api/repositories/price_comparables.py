@@ -0,0 +1,98 @@
+import logging
+from typing import Optional, Tuple
+from ..core.db import DB_ENABLED
+from ..core.db_helpers import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# Price comparables (api.jobs.price_comparables)
+# -----------------------------------------------------------------------------
+
+# (make, model, year, miles_band), make and model lower-cased
+ComparableKey = Tuple[str, str, int, int]
+
+def refresh_price_comparables(after_id: int, miles_band: int, window_days: int) -> Tuple[int, int, int]:
+    """
+    Recompute price_comparables for every (make, model, year) with a listing id above `after_id`.
+
+    Each touched group is rebuilt from the newest listing of each of its vehicles seen in the last
+    `window_days`, so its percentiles are exact; untouched groups are not read. after_id=0
+    rebuilds the whole table. Runs in one transaction and returns (highest listing id covered,
+    groups touched, rows written); pass the first value as `after_id` next time.
+    """
+    if not DB_ENABLED:
+        return after_id, 0, 0
+    result: Tuple[int, int, int] = (after_id, 0, 0)
+    error: Optional[Exception] = None
+    with get_db_connection() as conn:
+        if not conn:
+            error = RuntimeError("database unavailable")
+        else:
+            try:
+                with conn.transaction(), conn.cursor() as cur:
+                    cur.execute("select coalesce(max(id), 0) from listings")
+                    upto = cur.fetchone()[0]
+                    if upto > after_id:
+                        cur.execute("""
+                            create temp table comparables_touched on commit drop as
+                            select distinct lower(v.make) as make, lower(v.model) as model, v.year
+                            from listings l
+                            join vehicles v on v.vehicle_key = l.vehicle_key
+                            where l.id > %s and l.id <= %s
+                              and v.make is not null and v.model is not null and v.year is not null
+                        """, (after_id, upto))
+                        touched = cur.rowcount
+                        if after_id == 0:
+                            cur.execute("delete from price_comparables")
+                        else:
+                            cur.execute("""
+                                delete from price_comparables c
+                                using comparables_touched t
+                                where (c.make, c.model, c.year) = (t.make, t.model, t.year)
+                            """)
+                        cur.execute("""
+                            insert into price_comparables (make, model, year, miles_band, n, p25, p50, p75, refreshed_at)
+                            select make, model, year, miles_band, count(*),
+                                   percentile_cont(0.25) within group (order by price),
+                                   percentile_cont(0.5) within group (order by price),
+                                   percentile_cont(0.75) within group (order by price),
+                                   now()
+                            from (
+                                select distinct on (l.vehicle_key)
+                                       t.make, t.model, t.year, coalesce(l.miles, 0) / %(band)s as miles_band, l.price
+                                from comparables_touched t
+                                join vehicles v on lower(v.make) = t.make and lower(v.model) = t.model and v.year = t.year
+                                join listings l on l.vehicle_key = v.vehicle_key
+                                where l.last_seen_at >= now() - make_interval(days => %(days)s)
+                                  and l.price > 0
+                                order by l.vehicle_key, l.created_at desc, l.id desc
+                            ) latest
+                            group by make, model, year, miles_band
+                        """, {"band": miles_band, "days": window_days})
+                        result = (upto, touched, cur.rowcount)
+            except Exception as e:
+                logger.error("Error in refresh_price_comparables: %s", e, exc_info=True)
+                error = e
+    if error is not None:
+        raise error
+    return result
+
+def load_price_comparables(min_samples: int) -> Optional[dict[ComparableKey, float]]:
+    """Median price by (make, model, year, miles_band) for groups of at least `min_samples` vehicles; None on failure."""
+    if not DB_ENABLED:
+        return {}
+    with get_db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    select make, model, year, miles_band, p50::float8
+                    from price_comparables
+                    where n >= %s
+                """, (min_samples,))
+                return {(make, model, year, band): p50 for make, model, year, band, p50 in cur.fetchall()}
+        except Exception as e:
+            logger.error("Error in load_price_comparables: %s", e, exc_info=True)
+            return None
@@ -1,17 +1,30 @@
 import json
+import uuid
+import base64
+import hashlib
 import logging
 import datetime
-from typing import List, Optional
+from typing import Any, Callable, Iterator, List, Optional, Tuple
 from datetime import timezone
+from ..core.cache import ResultCache
+from ..core.config import settings
 from ..core.db import DB_ENABLED
 from ..core.db_helpers import get_db_connection
-from ..schemas.listing import ListingIn, ListingOut
+from ..schemas.listing import ListingFilters, ListingIn, ListingOut, ListingPage, ListingScoreIn
 from ..schemas.listing import Decision
+from ..schemas.ingest import IngestReport, IngestRowError
 
 # In-memory fallback for listings
 _BY_ID: dict[str, ListingOut] = {}
 _IDS_BY_VIN: dict[str, list[str]] = {}
 
+# Listing pages by (data version, query); invalidated by writes made through this module
+_LISTINGS_CACHE = ResultCache(settings.LISTINGS_CACHE_MAX_ENTRIES, settings.LISTINGS_CACHE_TTL_SECONDS)
+
+# Latest score per VIN with the inputs it was computed from, in front of scores_latest
+# (see get_memoized_scores); entries are (model_version, price, miles, dom, pivot, score, buy_max, reasons)
+_SCORE_MEMO = ResultCache(settings.SCORE_MEMO_MAX_ENTRIES, settings.SCORE_MEMO_TTL_SECONDS)
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -20,101 +33,369 @@ def create_decision_from_data(data: dict) -> Optional[Decision]:
     """Create a Decision object from data if status, reasonCodes, or buyMax are present."""
     if data.get("status") or data.get("reasonCodes") or data.get("buyMax"):
         return Decision(
-            status=data.get("status", ""),
-            reasons=data.get("reasonCodes", []),
+            status=data.get("status") or "",
+            reasons=data.get("reasonCodes") or [],
             buyMax=float(data.get("buyMax", 0)) if data.get("buyMax") is not None else 0
         )
     return None
 
+# Normalized fields that identify a re-sent listing; created_at and the derived vehicle_key are
+# excluded because feeds stamp them per delivery.
+_CONTENT_HASH_FIELDS = (
+    "vin", "year", "make", "model", "trim", "source", "price", "miles", "dom",
+    "location", "buyer_id", "radius", "reason_codes", "buy_max", "status",
+)
+
+def listing_content_hash(n: dict) -> str:
+    """Canonical SHA-256 of a normalized listing, stored in listings.content_hash."""
+    canonical = json.dumps([n[f] for f in _CONTENT_HASH_FIELDS], separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def normalize_listing(item: ListingIn, buyer_id: Optional[str] = None) -> dict:
+    """
+    Normalize an incoming listing into the column values written by ingest.
+
+    Fields are read straight off the model and `payload` is serialized by pydantic in a single
+    pass, so no intermediate dict is built per row.
+    """
+    vin = item.vin.strip().upper() if item.vin and item.vin.strip() else None
+
+    if vin:
+        vehicle_key = vin
+    else:
+        # unique by timestamp when VIN missing; include source to be extra safe
+        created = item.created_at or datetime.datetime.now(timezone.utc)
+        src = (item.source or "unknown").strip().lower()
+        vehicle_key = f"{src}#{created.isoformat(timespec='milliseconds')}"
+
+    # Handle external API data: map status, reasonCodes, buyMax to Decision object
+    decision = create_decision_from_data({"status": item.status, "reasonCodes": item.reasonCodes, "buyMax": item.buyMax})
+
+    n = {
+        "vehicle_key": vehicle_key,
+        "vin": vin,
+        "year": item.year,
+        "make": item.make.strip(),
+        "model": item.model.strip(),
+        "trim": item.trim or None,
+        "source": item.source,
+        "price": item.price,
+        "miles": item.miles,
+        "dom": item.dom,
+        "location": item.location,
+        # Use buyer_id from authenticated context when provided; fallback to incoming buyer_id
+        "buyer_id": buyer_id or item.buyer_id or None,
+        "radius": item.radius,
+        "reason_codes": item.reasonCodes,
+        "buy_max": float(item.buyMax) if item.buyMax is not None else None,
+        "status": item.status,
+        "decision": decision,
+        "payload": item.model_dump_json(),
+    }
+    n["content_hash"] = listing_content_hash(n)
+    return n
+
+
+# Signature of services.score_listing: (score, buy_max, reason_codes)
+Scorer = Callable[[ListingScoreIn], Tuple[int, float, List[str]]]
+
+def score_normalized(normalized: List[dict], scorer: Scorer) -> None:
+    """Score a normalized batch in memory, storing the result under n["score"].
+
+    A ScoringModel scorer also records its version under n["model_version"] and the price
+    baseline it scored against under n["pivot"]."""
+    model_version = getattr(scorer, "version", None)
+    pivot = getattr(scorer, "pivot", None)
+    for n in normalized:
+        item = ListingScoreIn(
+            vehicle_key=n["vehicle_key"], vin=n["vin"], price=n["price"],
+            miles=n["miles"], dom=n["dom"], source=n["source"],
+            year=n["year"], make=n["make"], model=n["model"],
+        )
+        n["score"] = scorer(item)
+        n["model_version"] = model_version
+        n["pivot"] = pivot(item) if pivot else None
+
+def _score_row(n: dict) -> Optional[tuple]:
+    """(score, buy_max, reason_codes, model_version, price, miles, dom, pivot) to write to scores for a listing, if any.
+
+    A computed score supersedes the placeholder row written for a feed-supplied decision, which
+    records no model or inputs."""
+    if not n["vin"]:
+        return None
+    if n.get("score"):
+        return (*n["score"], n.get("model_version"), n["price"], n["miles"], n["dom"], n.get("pivot"))
+    if n["decision"]:
+        return 0, n["decision"].buyMax, n["decision"].reasons, None, None, None, None, None
+    return None
+
+def _listing_out_from_normalized(listing_id: str, n: dict) -> ListingOut:
+    out = ListingOut(
+        id=listing_id, vehicle_key=n["vehicle_key"], vin=n["vin"], year=n["year"], make=n["make"], model=n["model"],
+        trim=n["trim"], miles=n["miles"], price=n["price"], dom=n["dom"],
+        source=n["source"], location=n["location"], buyer_id=n["buyer_id"],
+        radius=n["radius"], reasonCodes=n["reason_codes"],
+        buyMax=n["buy_max"], status=n["status"], score=None, decision=n["decision"]
+    )
+    if n.get("score"):
+        # same shape list_listings returns once the score row is the latest for the vehicle
+        out.score, out.buyMax, out.reasonCodes = n["score"]
+    return out
+
 # ============================================================================
 # LISTINGS REPOSITORY
 # ============================================================================
 
-def ingest_listings(rows: List[ListingIn], buyer_id: Optional[str] = None) -> List[ListingOut]:
+# Columns COPY'd into the per-session staging table used by bulk ingest
+_STAGE_COLUMNS = (
+    "ord", "vehicle_key", "vin", "source", "price", "miles", "dom",
+    "location", "buyer_id", "payload", "status", "decision_buy_max", "decision_reasons", "content_hash",
+    "has_score", "score", "score_buy_max", "score_reasons", "score_model_version",
+    "score_price", "score_miles", "score_dom", "score_pivot",
+)
+
+
+def _touch_existing_listings(cur, normalized: List[dict]) -> dict[str, str]:
+    """
+    Find already-ingested rows by content hash in one statement, bumping their last_seen_at.
+
+    Only rows last seen more than LISTINGS_TOUCH_INTERVAL_SECONDS ago are written, so a feed that
+    re-sends the same rows every few minutes reads them instead of rewriting them each time.
+    """
+    cur.execute("""
+        with seen as (
+            select id, content_hash from listings where content_hash = any(%s)
+        ), touched as (
+            update listings l set last_seen_at = now()
+            from seen
+            where l.id = seen.id
+              and (l.last_seen_at is null or l.last_seen_at < now() - make_interval(secs => %s))
+        )
+        select content_hash, id from seen
+    """, (list({n["content_hash"] for n in normalized}), settings.LISTINGS_TOUCH_INTERVAL_SECONDS))
+    return {content_hash: str(lid) for content_hash, lid in cur.fetchall()}
+
+
+def _insert_listing_row(cur, n: dict, upsert_vehicle_row: bool = True) -> str:
+    """Write one normalized listing (vehicle, listing, then its optional score) and return its id."""
+    vehicle_key, vin = n["vehicle_key"], n["vin"]
+
+    # vehicles (skipped when the chunk's vehicles were already upserted as a set)
+    if upsert_vehicle_row:
+        _upsert_vehicles(cur, [_vehicle_row(n)])
+
+    # Prefer writing to buyer_id column;
+    cur.execute("""
+      insert into listings (vehicle_key, vin, source, price, miles, dom, location, buyer_id, payload,
+                            status, decision_buy_max, decision_reasons, content_hash)
+      values (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+      on conflict (content_hash) do nothing
+      returning id
+    """, (vehicle_key, vin, n["source"], n["price"], n["miles"], n["dom"],
+          n["location"], n["buyer_id"], n["payload"], n["status"], n["buy_max"], n["reason_codes"], n["content_hash"]))
+    row = cur.fetchone()
+    if row is None:
+        # a concurrent batch inserted the same listing first, and wrote its score with it
+        cur.execute("select id from listings where content_hash = %s", (n["content_hash"],))
+        return str(cur.fetchone()[0])
+
+    # Store the computed score, or the feed's decision data, in the scores table
+    score_row = _score_row(n)
+    if score_row:
+        cur.execute("""
+            insert into scores (vehicle_key, vin, score, buy_max, reason_codes, model_version, price, miles, dom, pivot)
+            values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (vehicle_key, vin, *score_row))
+    return str(row[0])
+
+
+def _ingest_rows(conn, normalized: List[dict], ids_by_hash: dict[str, str], errors_by_hash: dict[str, str]) -> None:
+    """
+    Row-by-row ingest with one transaction per INGEST_TX_CHUNK_SIZE rows and a savepoint per row.
+
+    A failing row rolls back to its savepoint and is reported in `errors_by_hash`; the rest of
+    the chunk still commits, paying a single commit instead of one per statement.
+    """
+    size = max(1, settings.INGEST_TX_CHUNK_SIZE)
+    for start in range(0, len(normalized), size):
+        chunk = normalized[start:start + size]
+        chunk_ids: dict[str, str] = {}
+        chunk_errors: dict[str, str] = {}
+        with conn.transaction():
+            with conn.cursor() as cur:
+                # One set-based upsert for the chunk's distinct vehicles; if any of them is
+                # rejected, fall back to upserting each row's vehicle inside its own savepoint.
+                try:
+                    with conn.transaction():
+                        _upsert_vehicles(cur, [_vehicle_row(n) for n in chunk])
+                    vehicles_done = True
+                except Exception as vehicles_exc:
+                    logging.error(f"Failed to upsert vehicles for chunk: {vehicles_exc}")
+                    vehicles_done = False
+
+                for n in chunk:
+                    try:
+                        with conn.transaction():
+                            chunk_ids[n["content_hash"]] = _insert_listing_row(cur, n, upsert_vehicle_row=not vehicles_done)
+                    except Exception as row_exc:
+                        logging.error(f"Failed to insert listing into database: {row_exc}")
+                        chunk_errors[n["content_hash"]] = str(row_exc)
+        ids_by_hash.update(chunk_ids)
+        errors_by_hash.update(chunk_errors)
+
+
+def _ingest_bulk(conn, normalized: List[dict], ids_by_hash: dict[str, str]) -> None:
+    """
+    Set-based ingest: COPY the whole batch into a session-local staging table, then merge it
+    into listings, and scores for the listings it inserted, with a single statement (vehicles go
+    through _upsert_vehicles).
+
+    Temp tables are never WAL-logged, and ON COMMIT DELETE ROWS empties the stage at the end of
+    every batch so the table can be reused by the next batch on the same pooled connection.
+    Listing ids are drawn from the listings sequence while copying and mapped back by content hash.
+    """
+    with conn.transaction():
+        with conn.cursor() as cur:
+            cur.execute("""
+                create temp table if not exists ingest_stage (
+                    ord int not null,
+                    id int not null default nextval(pg_get_serial_sequence('listings', 'id')),
+                    vehicle_key text not null,
+                    vin text,
+                    source text,
+                    price numeric,
+                    miles int,
+                    dom int,
+                    location text,
+                    buyer_id text,
+                    payload jsonb,
+                    status text,
+                    decision_buy_max numeric,
+                    decision_reasons text[],
+                    content_hash text not null,
+                    has_score boolean not null default false,
+                    score int,
+                    score_buy_max numeric,
+                    score_reasons text[],
+                    score_model_version text,
+                    score_price numeric,
+                    score_miles int,
+                    score_dom int,
+                    score_pivot double precision
+                ) on commit delete rows
+            """)
+
+            with cur.copy(f"copy ingest_stage ({', '.join(_STAGE_COLUMNS)}) from stdin") as copy:
+                for ord_, n in enumerate(normalized):
+                    score_row = _score_row(n) or (None,) * 8
+                    copy.write_row((
+                        ord_, n["vehicle_key"], n["vin"], n["source"], n["price"], n["miles"], n["dom"],
+                        n["location"], n["buyer_id"], n["payload"], n["status"], n["buy_max"], n["reason_codes"],
+                        n["content_hash"], score_row[0] is not None, *score_row,
+                    ))
+
+            _upsert_vehicles(cur, [_vehicle_row(n) for n in normalized])
+
+            # scores are written only for the listings this statement inserted; one that lost a
+            # content_hash race to a concurrent batch got its score from that batch
+            cur.execute("""
+                with new_listings as (
+                    insert into listings (id, vehicle_key, vin, source, price, miles, dom, location, buyer_id, payload,
+                                          status, decision_buy_max, decision_reasons, content_hash)
+                    select id, vehicle_key, vin, source, price, miles, dom, location, buyer_id, payload,
+                           status, decision_buy_max, decision_reasons, content_hash
+                    from ingest_stage
+                    order by ord
+                    on conflict (content_hash) do nothing
+                    returning content_hash, id
+                ), staged_scores as (
+                    insert into scores (vehicle_key, vin, score, buy_max, reason_codes, model_version, price, miles, dom, pivot)
+                    select st.vehicle_key, st.vin, st.score, st.score_buy_max, st.score_reasons, st.score_model_version,
+                           st.score_price, st.score_miles, st.score_dom, st.score_pivot
+                    from ingest_stage st
+                    join new_listings nl on nl.id = st.id
+                    where st.has_score
+                    order by st.ord
+                )
+                select content_hash, id from new_listings
+            """)
+            inserted = {content_hash: str(lid) for content_hash, lid in cur.fetchall()}
+
+            missing = [n["content_hash"] for n in normalized if n["content_hash"] not in inserted]
+            if missing:
+                # rows a concurrent batch inserted first keep that batch's id
+                cur.execute("select content_hash, id from listings where content_hash = any(%s)", (missing,))
+                inserted.update({content_hash: str(lid) for content_hash, lid in cur.fetchall()})
+
+    ids_by_hash.update(inserted)
+
+
+def ingest_listings_report(rows: List[ListingIn], buyer_id: Optional[str] = None, scorer: Optional[Scorer] = None) -> IngestReport:
+    """
+    Ingest a batch and report the stored listings plus a structured error for every row that was not stored.
+
+    With a `scorer`, every row is scored in memory and returned scored; newly stored listings get
+    their scores row in the same statement as the listing. Re-sent listings are returned with the
+    computed score but do not add another scores row.
+    """
     out: list[ListingOut] = []
     if DB_ENABLED:
+        normalized = [normalize_listing(item, buyer_id) for item in rows]
+        if scorer:
+            score_normalized(normalized, scorer)
+        ids_by_hash: dict[str, str] = {}
+        errors_by_hash: dict[str, str] = {}
+        failure: Optional[str] = None
+        fresh_rows: List[dict] = []
         with get_db_connection() as conn:
             if not conn:
-                return out
-                
-            try:
-                with conn.cursor() as cur:
-                    for item in rows:
-                        norm = item.model_dump()
-                        vin_raw = norm.get("vin")
-                        vin = vin_raw.strip().upper() if vin_raw and vin_raw.strip() else None
-
-                        def make_vehicle_key(n):
-                            if vin:
-                                return vin
-                            # unique by timestamp when VIN missing; include source to be extra safe
-                            created = (n.get("created_at") or datetime.datetime.now(timezone.utc))
-                            src = (n.get("source") or "unknown").strip().lower()
-                            return f"{src}#{created.isoformat(timespec='milliseconds')}"
-
-                        vehicle_key = make_vehicle_key(norm)
-                        make = norm["make"].strip()
-                        model = norm["model"].strip()
-                        trim = (norm["trim"] or None)
-
-                        # Handle external API data: map status, reasonCodes, buyMax to Decision object
-                        decision = create_decision_from_data(norm)
-
-                        # vehicles
-                        cur.execute("""
-                             insert into vehicles (vehicle_key, vin, year, make, model, trim)
-                             values (%s,%s,%s,%s,%s,%s)
-                             on conflict (vehicle_key) do update set vin=excluded.vin, year=excluded.year, make=excluded.make, model=excluded.model, trim=excluded.trim
-                         """, (vehicle_key, vin, norm["year"], make, model, trim))
-                        
-                        # Store decision data in scores table if provided
-                        if decision and vin:
-                            try:
-                                cur.execute("""
-                                    insert into scores (vehicle_key, vin, score, buy_max, reason_codes)
-                                    values (%s, %s, %s, %s, %s)
-                                """, (vehicle_key, vin, 0, decision.buyMax, decision.reasons))
-                            except Exception as log_exc:
-                                logging.error(f"Failed to insert score data: {log_exc}")
-                        
-                        # listings
-                        # Convert datetime objects to ISO format strings for JSON serialization
-                        payload_data = norm.copy()
-                        if "created_at" in payload_data and payload_data["created_at"]:
-                            if isinstance(payload_data["created_at"], datetime.datetime):
-                                payload_data["created_at"] = payload_data["created_at"].isoformat()
+                failure = "database unavailable"
+            else:
+                try:
+                    # Re-sent listings keep their original row; only a stale last_seen_at is touched
+                    with conn.cursor() as cur:
+                        ids_by_hash.update(_touch_existing_listings(cur, normalized))
 
-                        # Use buyer_id from authenticated context when provided; fallback to incoming buyer_id
-                        buyer_from_id = buyer_id or norm.get("buyer_id") or None
+                    fresh: dict[str, dict] = {}
+                    for n in normalized:
+                        if n["content_hash"] not in ids_by_hash:
+                            fresh.setdefault(n["content_hash"], n)
+                    fresh_rows = list(fresh.values())
 
-                        # Prefer writing to buyer_id column;
+                    # Large batches go through COPY + set-based merges; a failed bulk load rolls back
+                    # completely, so the row-by-row path can safely retry it with per-row error handling.
+                    bulk_done = False
+                    if len(fresh_rows) >= settings.INGEST_BULK_THRESHOLD:
                         try:
-                            cur.execute("""
-                              insert into listings (vehicle_key, vin, source, price, miles, dom, location, buyer_id, payload)
-                              values (%s,%s,%s,%s,%s,%s,%s,%s,%s) returning id
-                            """, (vehicle_key, vin, norm["source"], norm["price"], norm["miles"], norm["dom"], 
-                                  norm.get("location"), buyer_from_id, json.dumps(payload_data)))
-                            new_id = str(cur.fetchone()[0])
-                        except Exception as log_exc:
-                            logging.error(f"Failed to insert listing into database: {log_exc}")
-                            new_id = f"error-{len(out)+1}"
-                        
-                        # Extract reasonCodes, buyMax, and status for ListingOut
-                        reason_codes = norm.get("reasonCodes", [])
-                        buy_max = float(norm.get("buyMax", 0)) if norm.get("buyMax") is not None else None
-                        status = norm.get("status", "")
-                        
-                        out.append(ListingOut(
-                            id=new_id, vehicle_key=vehicle_key, vin=vin, year=norm["year"], make=make, model=model,
-                            trim=trim, miles=norm["miles"], price=norm["price"], dom=norm["dom"],
-                            source=norm["source"], location=norm.get("location"), buyer_id=buyer_from_id,
-                            radius=norm.get("radius", 25), reasonCodes=reason_codes,
-                            buyMax=buy_max, status=status, score=None, decision=decision
-                        ))
-            except Exception as e:
-                logging.error(f"Database error in ingest_listings: {e}")
-                return out
-        return out
+                            _ingest_bulk(conn, fresh_rows, ids_by_hash)
+                            bulk_done = True
+                        except Exception as e:
+                            logging.error(f"Bulk ingest failed, falling back to row-by-row: {e}")
+
+                    if fresh_rows and not bulk_done:
+                        _ingest_rows(conn, fresh_rows, ids_by_hash, errors_by_hash)
+                except Exception as e:
+                    logging.error(f"Database error in ingest_listings: {e}")
+                    failure = str(e)
+        if fresh_rows:
+            # a batch of re-sent rows changes nothing listing pages show
+            _LISTINGS_CACHE.invalidate()
+        # only the VINs that got a scores row have a new latest score
+        scored_vins = {n["vin"] for n in fresh_rows if _score_row(n)}
+        if scored_vins:
+            _SCORE_MEMO.discard(scored_vins)
+
+        errors: list[IngestRowError] = []
+        for index, n in enumerate(normalized):
+            content_hash = n["content_hash"]
+            if content_hash in ids_by_hash:
+                out.append(_listing_out_from_normalized(ids_by_hash[content_hash], n))
+            elif content_hash in errors_by_hash:
+                errors.append(IngestRowError(index=index, vin=n["vin"], error=errors_by_hash[content_hash]))
+            else:
+                # never attempted or its chunk failed to commit; safe to resend
+                errors.append(IngestRowError(index=index, vin=n["vin"], error=failure or "not ingested", retryable=True))
+        return IngestReport(listings=out, errors=errors)
 
     # in-memory fallback
     for item in rows:
@@ -135,75 +416,488 @@ def ingest_listings(rows: List[ListingIn], buyer_id: Optional[str] = None) -> Li
             dom=item.dom, source=item.source, location=norm.get("location"), buyer_id=buyer_id or item.buyer_id,
             radius=item.radius or 25, reasonCodes=reason_codes, buyMax=buy_max, status=status, decision=decision
         )
+        if scorer:
+            obj.score, obj.buyMax, obj.reasonCodes = scorer(ListingScoreIn(
+                vehicle_key=vin or lid, vin=vin, price=item.price, miles=item.miles, dom=item.dom, source=item.source,
+                year=item.year, make=obj.make, model=obj.model,
+            ))
         _BY_ID[lid] = obj
         if vin:
             _IDS_BY_VIN.setdefault(vin, []).append(lid)
         out.append(obj)
-    return out
+    return IngestReport(listings=out, errors=[])
+
+def ingest_listings(rows: List[ListingIn], buyer_id: Optional[str] = None, scorer: Optional[Scorer] = None) -> List[ListingOut]:
+    """Ingest a batch and return the stored listings in input order; rows that failed are omitted."""
+    return ingest_listings_report(rows, buyer_id, scorer).listings
+
+# Output field -> SQL expression over the l/v/s/u aliases, cast to its ListingOut type, so rows
+# can be turned into models without validation. `status` and `decision` come from the decision
+# columns below; `radius` is constant. s is the latest score per VIN (scores_latest).
+_LISTING_FIELD_SQL = {
+    "id": "l.id::text",
+    "vehicle_key": "l.vehicle_key",
+    "vin": "COALESCE(l.vin, '')",
+    "year": "COALESCE(v.year, 0)",
+    "make": "COALESCE(v.make, '')",
+    "model": "COALESCE(v.model, '')",
+    "trim": "v.trim",
+    "miles": "COALESCE(l.miles, 0)",
+    "price": "COALESCE(l.price, 0)::float8",
+    "dom": "COALESCE(l.dom, 0)",
+    "source": "l.source",
+    "location": "l.location",
+    "buyer_id": "l.buyer_id",
+    "buyer_username": "u.username",
+    "score": "COALESCE(s.score, 0)",
+    "buyMax": "s.buy_max::float8",
+    "reasonCodes": "COALESCE(s.reason_codes, ARRAY[]::text[])",
+}
+
+# Decision fields promoted out of the payload; the JSONB itself is only null-checked, never read
+# (legacy rows without a payload report status "")
+_DECISION_SQL = "l.payload IS NOT NULL, l.status, l.decision_reasons, l.decision_buy_max::float8"
+
+LISTING_FIELDS = tuple(ListingOut.model_fields)
+
+_FULL_FIELD_ORDER = (
+    "id", "vehicle_key", "vin", "year", "make", "model", "trim", "miles", "price", "dom", "source",
+    "location", "buyer_id", "buyer_username", "score", "buyMax", "reasonCodes",
+)
+
+_LISTING_PAGE_COLUMNS = ", ".join(_LISTING_FIELD_SQL[f] for f in _FULL_FIELD_ORDER) + "," + _DECISION_SQL
+
+_LISTING_JOIN_SQL = {
+    "v": "LEFT JOIN vehicles v ON v.vehicle_key = l.vehicle_key",
+    "s": "LEFT JOIN scores_latest s ON s.vin = l.vin",
+    "u": "LEFT JOIN users u ON u.id::text = l.buyer_id",
+}
+
+_FIELD_JOINS = {
+    "year": "v", "make": "v", "model": "v", "trim": "v",
+    "score": "s", "buyMax": "s", "reasonCodes": "s",
+    "buyer_username": "u",
+}
+
+# Newest listing per vehicle: no other listing for the same vehicle_key is newer by (created_at, id)
+_LATEST_PER_VEHICLE_COND = """
+    NOT EXISTS (
+        SELECT 1 FROM listings newer
+        WHERE newer.vehicle_key = l.vehicle_key
+          AND (newer.created_at, newer.id) > (l.created_at, l.id)
+    )
+"""
+
+# Whitelisted sorts: name -> (SQL key expression, type the cursor value is cast to, join it needs).
+# The expressions match the expression indexes in db/schema.sql; ties break on l.id.
+_LISTING_SORT_KEYS = {
+    "newest": ("l.created_at", "timestamptz", None),
+    "price": ("COALESCE(l.price, 0)", "numeric", None),
+    "miles": ("COALESCE(l.miles, 0)", "int", None),
+    "year": ("COALESCE(v.year, 0)", "int", "v"),
+    "score": ("COALESCE(s.score, 0)", "int", "s"),
+}
+
+def _listing_sort(sort: str) -> Tuple[str, str, Optional[str], bool]:
+    """(key expression, cursor cast type, join needed, descending) for a ListingFilters.sort value."""
+    if sort == "oldest":
+        return (*_LISTING_SORT_KEYS["newest"], False)
+    if sort == "newest":
+        return (*_LISTING_SORT_KEYS["newest"], True)
+    descending = sort.startswith("-")
+    return (*_LISTING_SORT_KEYS[sort.lstrip("-")], descending)
+
+def parse_listing_fields(spec: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a `fields=a,b,c` parameter; None means every field. Raises ValueError on unknown names."""
+    if not spec:
+        return None
+    fields = tuple(dict.fromkeys(f.strip() for f in spec.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in LISTING_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}; available: {', '.join(LISTING_FIELDS)}")
+    return fields or None
+
+def encode_listing_cursor(sort: str, key: Any, listing_id: int) -> str:
+    """Opaque keyset cursor for the row a page ended on, bound to the sort that produced it."""
+    value = key.isoformat() if isinstance(key, datetime.datetime) else str(key)
+    raw = json.dumps([sort, value, listing_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_listing_cursor(cursor: str, sort: str) -> Tuple[str, int]:
+    """Inverse of encode_listing_cursor; raises ValueError for anything it did not produce for `sort`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, listing_id = json.loads(raw)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    if cursor_sort != sort:
+        raise ValueError("cursor was issued for a different sort")
+    return str(value), int(listing_id)
+
+def _listing_filter_sql(filters: ListingFilters) -> Tuple[str, list, set[str]]:
+    """Compile filters into parameterized AND conditions over the l/v/s aliases, plus the joins they need."""
+    conditions: list[str] = []
+    params: list = []
+    joins: set[str] = set()
+
+    def add(condition: str, value: Any, join: Optional[str] = None) -> None:
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+            if join:
+                joins.add(join)
+
+    add("lower(v.make) = lower(%s)", filters.make.strip() if filters.make else None, "v")
+    add("lower(v.model) = lower(%s)", filters.model.strip() if filters.model else None, "v")
+    add("v.year >= %s", filters.year_min, "v")
+    add("v.year <= %s", filters.year_max, "v")
+    # same expressions as the price/miles sort keys, so idx_listings_price_id / _miles_id apply
+    # (a float8 parameter would cast the numeric column instead and rule the index out)
+    add("COALESCE(l.price, 0) >= %s::numeric", filters.price_min)
+    add("COALESCE(l.price, 0) <= %s::numeric", filters.price_max)
+    add("COALESCE(l.miles, 0) >= %s", filters.miles_min)
+    add("COALESCE(l.miles, 0) <= %s", filters.miles_max)
+    add("s.score >= %s", filters.min_score, "s")
+    add("l.source = %s", filters.source)
+    add("l.status = %s", filters.status)
+    add("l.buyer_id = %s", filters.buyer_id)
+    add("l.created_at >= %s", filters.start_date)
+    add("l.created_at <= %s", filters.end_date)
+    return "".join(f" AND {c}" for c in conditions), params, joins
+
+def _listing_from(latest_per_vehicle: bool, joins: set[str]) -> str:
+    join_sql = " ".join(_LISTING_JOIN_SQL[j] for j in ("v", "s", "u") if j in joins)
+    return f"FROM listings l {join_sql} WHERE {_LATEST_PER_VEHICLE_COND if latest_per_vehicle else 'true'}"
+
+def _estimate_rows(cur, query: str, params: tuple = ()) -> Optional[int]:
+    """Planner row estimate for `query` (from pg_class.reltuples / column statistics), without running it."""
+    try:
+        cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        plan = cur.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logging.error(f"Row estimate failed: {e}")
+        return None
+
+def _decision_from_columns(status: Optional[str], reasons: Optional[list], buy_max: Optional[float]) -> Optional[Decision]:
+    """Same rule as create_decision_from_data, applied to the listing's decision columns."""
+    if status or reasons or buy_max:
+        return Decision.model_construct(buyMax=buy_max or 0.0, status=status or "", reasons=reasons or [])
+    return None
+
+def _listing_out_from_row(row: tuple) -> ListingOut:
+    """Build a ListingOut from a _LISTING_PAGE_COLUMNS row without re-validating it."""
+    (
+        rid, vehicle_key, vin, year, make, model, trim, miles, price, dom,
+        source, location, buyer_id, buyer_username, score, buy_max, reason_codes,
+        has_payload, decision_status, decision_reasons, decision_buy_max
+    ) = row
+
+    return ListingOut.model_construct(
+        id=rid, vehicle_key=vehicle_key, vin=vin, year=year, make=make, model=model, trim=trim,
+        miles=miles, price=price, dom=dom, source=source,
+        location=location, buyer_id=buyer_id, buyer_username=buyer_username,
+        radius=25, reasonCodes=reason_codes, buyMax=buy_max,
+        status=decision_status if has_payload else "", score=score,
+        decision=_decision_from_columns(decision_status, decision_reasons, decision_buy_max),
+    )
+
+def _listing_select(fields: Optional[Tuple[str, ...]]) -> Tuple[str, set[str], Callable[[tuple], ListingOut]]:
+    """
+    (select list, joins, row mapper) for a sparse fieldset; None selects every field.
+
+    Sparse models only have the requested fields set, so they serialize with exclude_unset.
+    """
+    if fields is None:
+        return _LISTING_PAGE_COLUMNS, {"v", "s", "u"}, _listing_out_from_row
+
+    sql_fields = [f for f in fields if f in _LISTING_FIELD_SQL]
+    with_payload = "status" in fields or "decision" in fields
+    columns = [_LISTING_FIELD_SQL[f] for f in sql_fields] + ([_DECISION_SQL] if with_payload else [])
+    joins = {_FIELD_JOINS[f] for f in sql_fields if f in _FIELD_JOINS}
+    n = len(sql_fields)
+
+    def to_model(row: tuple) -> ListingOut:
+        values = dict(zip(sql_fields, row))
+        if with_payload:
+            has_payload, status, reasons, buy_max = row[n:]
+            if "status" in fields:
+                values["status"] = status if has_payload else ""
+            if "decision" in fields:
+                values["decision"] = _decision_from_columns(status, reasons, buy_max)
+        if "radius" in fields:
+            values["radius"] = 25
+        return ListingOut.model_construct(**values)
+
+    return ", ".join(columns) or "NULL", joins, to_model
+
+def _listing_page_query(
+    latest_per_vehicle: bool, filters: ListingFilters, limit: Optional[int], cursor: Optional[str],
+    fields: Optional[Tuple[str, ...]],
+) -> Tuple[str, list, str, list, Callable[[tuple], ListingOut]]:
+    """
+    Build the keyset query under the filters, sort and fieldset.
+
+    Returns (query, params, estimate_query, estimate_params, row mapper). The sort key and l.id
+    are selected as two extra leading columns for the cursor; with a limit, one extra row is
+    fetched to tell whether a next page exists. Joins are only added when a selected field, a
+    filter or the sort needs them.
+    """
+    key, key_type, sort_join, descending = _listing_sort(filters.sort)
+    where, params, filter_joins = _listing_filter_sql(filters)
+    columns, field_joins, to_model = _listing_select(fields)
+    if sort_join:
+        filter_joins.add(sort_join)
+
+    estimate_query = f"SELECT 1 {_listing_from(latest_per_vehicle, filter_joins)}{where}"
+    estimate_params = list(params)
+
+    if cursor:
+        value, after_id = decode_listing_cursor(cursor, filters.sort)
+        where += f" AND ({key}, l.id) {'<' if descending else '>'} (%s::{key_type}, %s)"
+        params += [value, after_id]
+
+    direction = "DESC" if descending else "ASC"
+    query = (
+        f"SELECT {key} AS sort_key, l.id AS cursor_id, {columns} "
+        f"{_listing_from(latest_per_vehicle, filter_joins | field_joins)}{where} "
+        f"ORDER BY {key} {direction}, l.id {direction}"
+    )
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit + 1)
+    return query, params, estimate_query, estimate_params, to_model
+
+def _fetch_listing_page(
+    latest_per_vehicle: bool, filters: ListingFilters, limit: Optional[int], cursor: Optional[str],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Optional[ListingPage]:
+    """Run one keyset page and return it with its next cursor and a total estimate; None on failure."""
+    with get_db_connection() as conn:
+        if not conn:
+            return None
+
+        try:
+            with conn.cursor() as cur:
+                query, params, estimate_query, estimate_params, to_model = _listing_page_query(
+                    latest_per_vehicle, filters, limit, cursor, fields
+                )
+                total = _estimate_rows(cur, estimate_query, tuple(estimate_params))
+                cur.execute(query, params)
+                rows = cur.fetchall()
+                next_cursor = None
+                if limit is not None and len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = encode_listing_cursor(filters.sort, rows[-1][0], rows[-1][1])
+                items = [to_model(row[2:]) for row in rows]
+                return ListingPage(items=items, next_cursor=next_cursor, total_estimate=total)
+        except Exception as e:
+            logging.error(f"Error in list_listings: {str(e)}")
+            return None
+
+def _cached_listing_page(
+    latest_per_vehicle: bool, filters: ListingFilters, limit: Optional[int], cursor: Optional[str],
+    fields: Optional[Tuple[str, ...]],
+) -> ListingPage:
+    """
+    _fetch_listing_page through _LISTINGS_CACHE.
+
+    The key carries the data version, so writes from other processes (the ingest worker) miss
+    the cache too. Failed reads are not cached.
+    """
+    def fetch() -> Optional[ListingPage]:
+        return _fetch_listing_page(latest_per_vehicle, filters, limit, cursor, fields)
+
+    version = get_data_version() if _LISTINGS_CACHE.enabled else None
+    if version is None:
+        page = fetch()
+    else:
+        key = (version, latest_per_vehicle, filters.model_dump_json(), limit, cursor, fields)
+        page = _LISTINGS_CACHE.get_or_compute(key, fetch)
+    return page or ListingPage(items=[])
+
+def _iter_listing_rows(
+    latest_per_vehicle: bool, filters: ListingFilters, limit: Optional[int], cursor: Optional[str],
+    fields: Optional[Tuple[str, ...]], batch_size: int,
+) -> Iterator[ListingOut]:
+    """
+    Stream a listing query through a named server-side cursor, `batch_size` rows per round trip.
+
+    Only one batch is held in memory at a time. The pooled connection stays checked out until the
+    iterator is exhausted or closed. A failure after the first row ends the stream early; it is
+    logged because the response has already started.
+    """
+    with get_db_connection() as conn:
+        if not conn:
+            return
+        try:
+            query, params, _, _, to_model = _listing_page_query(latest_per_vehicle, filters, limit, cursor, fields)
+            if limit is not None:
+                params[-1] = limit  # no look-ahead row when streaming
+            # server-side cursors live inside a transaction on this autocommit connection
+            with conn.transaction():
+                with conn.cursor(name=f"listings_stream_{uuid.uuid4().hex}") as cur:
+                    cur.itersize = batch_size
+                    cur.execute(query, params)
+                    while True:
+                        rows = cur.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            yield to_model(row[2:])
+        except Exception as e:
+            logging.error(f"Error streaming listings: {e}", exc_info=True)
+
+def _memory_page(
+    items: list[ListingOut],
+    limit: Optional[int],
+    fields: Optional[Tuple[str, ...]] = None,
+    filters: Optional[ListingFilters] = None,
+    cursor: Optional[str] = None,
+) -> ListingPage:
+    """
+    Newest-first page of the in-memory store, used when no database is configured.
+
+    Only the buyer_id filter is applied here. Other filters, sorts and cursors raise ValueError
+    (a 400) rather than being ignored, so a query never silently returns something different
+    from what the database would. Pages are never cut with a next_cursor.
+    """
+    if cursor:
+        raise ValueError("cursor paging requires the database")
+    if filters:
+        unsupported = sorted(filters.model_dump(exclude_defaults=True, exclude={"buyer_id"}))
+        if unsupported:
+            raise ValueError(f"listing filters require the database: {', '.join(unsupported)}")
+        if filters.buyer_id is not None:
+            items = [item for item in items if item.buyer_id == filters.buyer_id]
+    items = list(reversed(items))  # newest first, like the database ordering
+    total = len(items)
+    if limit is not None:
+        items = items[:limit]
+    if fields is not None:
+        items = [ListingOut.model_construct(**item.model_dump(include=set(fields))) for item in items]
+    return ListingPage(items=items, total_estimate=total)
+
+def list_listings_page(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    filters: Optional[ListingFilters] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> ListingPage:
+    """
+    Newest listing per vehicle, filtered and sorted in SQL, one keyset page at a time.
+
+    `cursor` is the next_cursor of the previous page and is only valid for the same sort. Each
+    page is an index range scan over (sort key, id) plus an anti-join on
+    (vehicle_key, created_at, id), so its cost does not depend on how deep into the table it starts.
+    `fields` narrows the select list (see parse_listing_fields).
+    """
+    filters = filters or ListingFilters()
+    if cursor:
+        decode_listing_cursor(cursor, filters.sort)  # reject bad cursors before touching the pool
+    if DB_ENABLED:
+        return _cached_listing_page(True, filters, limit, cursor, fields)
+    return _memory_page(list(_BY_ID.values()), limit, fields, filters, cursor)
+
+def iter_listings(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    filters: Optional[ListingFilters] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[ListingOut]:
+    """Streaming counterpart of list_listings_page: yields rows as they are read from the server-side cursor."""
+    filters = filters or ListingFilters()
+    if cursor:
+        decode_listing_cursor(cursor, filters.sort)
+    if DB_ENABLED:
+        return _iter_listing_rows(True, filters, limit, cursor, fields, batch_size or settings.LISTINGS_STREAM_BATCH_SIZE)
+    return iter(_memory_page(list(_BY_ID.values()), limit, fields, filters, cursor).items)
 
 def list_listings(limit: Optional[int] = None) -> list[ListingOut]:
+    return list_listings_page(limit).items
+
+def get_listings_by_vehicle_keys(vehicle_keys: List[str]) -> dict[str, ListingOut]:
+    """
+    Newest listing for each of `vehicle_keys`, keyed by vehicle_key; keys without listings are absent.
+
+    One query over idx_listings_vehicle_key_created, however many listings the table holds.
+    """
+    keys = list(dict.fromkeys(k for k in vehicle_keys if k))
+    if not keys:
+        return {}
+    if not DB_ENABLED:
+        wanted = set(keys)
+        # _BY_ID is in insertion order, so the last listing seen per key is the newest
+        return {l.vehicle_key: l for l in _BY_ID.values() if l.vehicle_key in wanted}
+
+    with get_db_connection() as conn:
+        if not conn:
+            return {}
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT DISTINCT ON (l.vehicle_key) {_LISTING_PAGE_COLUMNS}
+                    {_listing_from(False, {"v", "s", "u"})} AND l.vehicle_key = ANY(%s)
+                    ORDER BY l.vehicle_key, l.created_at DESC, l.id DESC
+                """, (keys,))
+                return {listing.vehicle_key: listing for listing in map(_listing_out_from_row, cur.fetchall())}
+        except Exception as e:
+            logging.error(f"Database error in get_listings_by_vehicle_keys: {e}")
+            return {}
+
+def get_listing_by_vehicle_key(vehicle_key: str) -> Optional[ListingOut]:
+    """Newest listing for one vehicle_key, or None."""
+    return get_listings_by_vehicle_keys([vehicle_key]).get(vehicle_key)
+
+def _buyer_filters(
+    buyer_id: str,
+    start_date: Optional[datetime.datetime],
+    end_date: Optional[datetime.datetime],
+    filters: Optional[ListingFilters],
+) -> ListingFilters:
+    filters = (filters or ListingFilters()).model_copy(update={"buyer_id": buyer_id})
+    if start_date:
+        filters.start_date = start_date
+    if end_date:
+        filters.end_date = end_date
+    return filters
+
+def list_listings_by_buyer_page(
+    buyer_id: str,
+    start_date: Optional[datetime.datetime] = None,
+    end_date: Optional[datetime.datetime] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    filters: Optional[ListingFilters] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> ListingPage:
+    """Get listings for a specific buyer with optional filtering, one keyset page at a time"""
+    filters = _buyer_filters(buyer_id, start_date, end_date, filters)
+    if cursor:
+        decode_listing_cursor(cursor, filters.sort)
     if DB_ENABLED:
-        with get_db_connection() as conn:
-            if not conn:
-                return []
-                
-            try:
-                with conn.cursor() as cur:
-                    # Fixed query to prevent duplicates by using DISTINCT ON and proper JOINs
-                    query = """
-                  SELECT DISTINCT ON (l.vehicle_key) 
-                    l.id, l.vehicle_key, 
-                    COALESCE(l.vin, '') AS vin, 
-                    COALESCE(v.year, 0) as year, 
-                    COALESCE(v.make, '') as make, 
-                    COALESCE(v.model, '') as model, 
-                    v.trim,
-                    l.miles, l.price, l.dom, l.source, 
-                    l.location, l.buyer_id,
-                    u.username as buyer_username,
-                    COALESCE(s.score, 0) as score, 
-                    s.buy_max, 
-                    COALESCE(s.reason_codes, ARRAY[]::text[]) as reason_codes,
-                    l.payload
-                  FROM listings l
-                  LEFT JOIN vehicles v ON v.vehicle_key = l.vehicle_key
-                  LEFT JOIN (
-                    SELECT DISTINCT ON (vin) vin, score, buy_max, reason_codes
-                    FROM scores
-                    ORDER BY vin, created_at DESC
-                  ) s ON s.vin = l.vin
-                  LEFT JOIN users u ON u.id::text = l.buyer_id
-                  ORDER BY l.vehicle_key, l.created_at DESC
-                """
-                    
-                    if limit is not None:
-                        query += " LIMIT %s"
-                        cur.execute(query, (limit,))
-                    else:
-                        cur.execute(query)
-                    out: list[ListingOut] = []
-                    for rid, vehicle_key, vin, year, make, model, trim, miles, price, dom, source, location, buyer_id, buyer_username, score, buy_max, reason_codes, payload in cur.fetchall():
-                        # Extract decision data from payload if available
-                        decision = None
-                        status = ""
-                        if payload:
-                            payload_data = json.loads(payload) if isinstance(payload, str) else payload
-                            decision = create_decision_from_data(payload_data)
-                            status = payload_data.get("status", "")
-                        
-                        out.append(ListingOut(
-                            id=str(rid), vehicle_key=vehicle_key, vin=vin or "", year=int(year), make=make, model=model, trim=trim,
-                            miles=int(miles), price=float(price), dom=int(dom), source=source,
-                            location=location, buyer_id=buyer_id, buyer_username=buyer_username,
-                            radius=25, reasonCodes=reason_codes or [],
-                            buyMax=float(buy_max) if buy_max is not None else None,
-                            status=status, score=int(score) if score is not None else None, decision=decision
-                        ))
-                    return out
-            except Exception as e:
-                logging.error(f"Error in list_listings: {str(e)}")
-                return []
-    return list(_BY_ID.values())
+        return _cached_listing_page(False, filters, limit, cursor, fields)
+
+    # Fallback to in-memory filtering
+    return _memory_page(list(_BY_ID.values()), limit, fields, filters, cursor)
+
+def iter_listings_by_buyer(
+    buyer_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    filters: Optional[ListingFilters] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[ListingOut]:
+    """Streaming counterpart of list_listings_by_buyer_page"""
+    filters = _buyer_filters(buyer_id, None, None, filters)
+    if cursor:
+        decode_listing_cursor(cursor, filters.sort)
+    if DB_ENABLED:
+        return _iter_listing_rows(False, filters, limit, cursor, fields, batch_size or settings.LISTINGS_STREAM_BATCH_SIZE)
+    return iter(_memory_page(list(_BY_ID.values()), limit, fields, filters, cursor).items)
 
 def list_listings_by_buyer(
     buyer_id: str,
@@ -212,103 +906,7 @@ def list_listings_by_buyer(
     limit: Optional[int] = None
 ) -> list[ListingOut]:
     """Get listings for a specific buyer with optional date filtering"""
-    if DB_ENABLED:
-        with get_db_connection() as conn:
-            if not conn:
-                return []
-                
-            try:
-                with conn.cursor() as cur:
-                    # Build query with optional date filtering
-                    base_query = """
-                        SELECT 
-                            l.id, l.vehicle_key, 
-                            COALESCE(l.vin, '') AS vin, 
-                            COALESCE(v.year, 0) AS year, 
-                            COALESCE(v.make, '') AS make, 
-                            COALESCE(v.model, '') AS model, 
-                            v.trim,
-                            l.miles, l.price, l.dom, l.source, 
-                            l.location, l.buyer_id,
-                            u.username AS buyer_username,
-                            COALESCE(s.score, 0) AS score, 
-                            s.buy_max, 
-                            COALESCE(s.reason_codes, ARRAY[]::text[]) AS reason_codes,
-                            l.created_at,
-                            l.payload
-                        FROM listings l
-                        LEFT JOIN vehicles v ON v.vehicle_key = l.vehicle_key
-                        LEFT JOIN (
-                            SELECT DISTINCT ON (vin) vin, score, buy_max, reason_codes
-                            FROM scores
-                            ORDER BY vin, created_at DESC
-                        ) s ON s.vin = l.vin
-                        LEFT JOIN users u ON u.id::text = l.buyer_id
-                        WHERE l.buyer_id = %s
-                    """
-                    
-                    params = [buyer_id]
-                    
-                    if start_date:
-                        base_query += " AND l.created_at >= %s"
-                        params.append(start_date)
-                    
-                    if end_date:
-                        base_query += " AND l.created_at <= %s"
-                        params.append(end_date)
-                    
-                    base_query += " ORDER BY l.created_at DESC"
-                    
-                    if limit is not None:
-                        base_query += " LIMIT %s"
-                        params.append(limit)
-                    
-                    cur.execute(base_query, params)
-
-                    out: list[ListingOut] = []
-                    for (
-                        rid, vehicle_key, vin, year, make, model, trim, miles, price, dom,
-                        source, location, buyer_id, buyer_username, score, buy_max,
-                        reason_codes, created_at, payload
-                    ) in cur.fetchall():
-                        
-                        # Extract decision data from payload if available
-                        decision = None
-                        status = ""
-                        if payload:
-                            payload_data = json.loads(payload) if isinstance(payload, str) else payload
-                            decision = create_decision_from_data(payload_data)
-                            status = payload_data.get("status", "")
-                        
-                        out.append(ListingOut(
-                            id=str(rid),
-                            vehicle_key=vehicle_key,
-                            vin=vin or "",
-                            year=int(year),
-                            make=make,
-                            model=model,
-                            trim=trim,
-                            miles=int(miles),
-                            price=float(price),
-                            dom=int(dom),
-                            source=source,
-                            location=location,
-                            buyer_id=buyer_id,
-                            buyer_username=buyer_username,
-                            radius=25,
-                            reasonCodes=reason_codes or [],
-                            buyMax=float(buy_max) if buy_max is not None else None,
-                            status=status,
-                            score=int(score) if score is not None else None,
-                            decision=decision
-                        ))
-                    return out
-            except Exception as e:
-                logging.error(f"Database error: {e}")
-                return []
-
-    # Fallback to in-memory filtering
-    return [listing for listing in _BY_ID.values() if listing.buyer_id == buyer_id]
+    return list_listings_by_buyer_page(buyer_id, start_date, end_date, limit).items
 
 
 def get_buyer_stats(buyer_id: str, start_date: Optional[datetime.datetime] = None, end_date: Optional[datetime.datetime] = None) -> dict:
@@ -353,7 +951,7 @@ def get_buyer_stats(buyer_id: str, start_date: Optional[datetime.datetime] = Non
                             scored_query = """
                             SELECT COUNT(*) as scored_listings, AVG(s.score) as avg_score
                             FROM listings l
-                            JOIN v_latest_scores s ON s.vin = l.vin
+                            JOIN scores_latest s ON s.vin = l.vin
                             WHERE l.buyer_id = %s
                             """
                             scored_params = [buyer_id]
@@ -419,6 +1017,7 @@ def get_buyer_stats(buyer_id: str, start_date: Optional[datetime.datetime] = Non
 
 def update_cached_score(vin: str, score: int, buy_max: float, reasons: list[str]):
     # for in-memory cache parity; DB is handled in scores repo
+    _LISTINGS_CACHE.invalidate()
     if vin:
         for lid in _IDS_BY_VIN.get(vin, []):
             if lid in _BY_ID:
@@ -428,50 +1027,282 @@ def update_cached_score(vin: str, score: int, buy_max: float, reasons: list[str]
                 obj.reasonCodes = reasons or ["Heuristic"]
                 _BY_ID[lid] = obj
 
+# ============================================================================
+# DATA VERSION REPOSITORY
+# ============================================================================
+
+def get_data_version() -> Optional[int]:
+    """
+    Committed-write counter over listings, scores, vehicles and users (see data_versions).
+
+    Read it before the data it tags: a write landing in between then only makes the tag older
+    than the body, which costs one extra download rather than a stale 304. None without a database.
+    """
+    if not DB_ENABLED:
+        return None
+    with get_db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            with conn.cursor() as cur:
+                cur.execute("select coalesce(sum(version), 0) from data_versions")
+                return int(cur.fetchone()[0])
+        except Exception as e:
+            logging.error(f"Database error in get_data_version: {e}")
+            return None
+
+# ============================================================================
+# INGEST IDEMPOTENCY REPOSITORY
+# ============================================================================
+
+def get_idempotent_response(key: str, buyer_id: Optional[str]) -> Optional[tuple[int, Any]]:
+    """Return (status_code, body) stored for an unexpired Idempotency-Key, if any."""
+    if not DB_ENABLED:
+        return None
+    with get_db_connection() as conn:
+        if not conn:
+            return None
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    select status_code, response from ingest_idempotency_keys
+                    where key = %s and buyer_id = %s
+                      and created_at >= now() - make_interval(hours => %s)
+                """, (key, buyer_id or "", settings.INGEST_IDEMPOTENCY_TTL_HOURS))
+                row = cur.fetchone()
+                if not row:
+                    return None
+                status_code, response = row
+                return status_code, json.loads(response) if isinstance(response, str) else response
+        except Exception as e:
+            logging.error(f"Database error in get_idempotent_response: {e}")
+            return None
+
+def store_idempotent_response(key: str, buyer_id: Optional[str], status_code: int, response: Any) -> None:
+    """Remember the response for an Idempotency-Key and prune expired keys."""
+    if not DB_ENABLED:
+        return
+    with get_db_connection() as conn:
+        if not conn:
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    delete from ingest_idempotency_keys
+                    where created_at < now() - make_interval(hours => %s)
+                """, (settings.INGEST_IDEMPOTENCY_TTL_HOURS,))
+                cur.execute("""
+                    insert into ingest_idempotency_keys (key, buyer_id, status_code, response)
+                    values (%s, %s, %s, %s)
+                    on conflict (key, buyer_id) do update
+                    set status_code = excluded.status_code, response = excluded.response, created_at = now()
+                """, (key, buyer_id or "", status_code, json.dumps(response)))
+        except Exception as e:
+            logging.error(f"Database error in store_idempotent_response: {e}")
+
 # ============================================================================
 # SCORES REPOSITORY
 # ============================================================================
 
-def insert_score(vehicle_key: str, vin: str, score: int, buy_max: float, reasons: list[str]):
+def insert_score(vehicle_key: str, vin: str, score: int, buy_max: float, reasons: list[str], model_version: Optional[str] = None):
     if not DB_ENABLED:
         return
+    _LISTINGS_CACHE.invalidate()
+    _SCORE_MEMO.discard([vin])  # the new latest row records no inputs
     with get_db_connection() as conn:
         if not conn:
             return
         with conn.cursor() as cur:
             cur.execute(
                 """
-                insert into scores (vehicle_key, vin, score, buy_max, reason_codes)
-                values (%s, %s, %s, %s, %s)
+                insert into scores (vehicle_key, vin, score, buy_max, reason_codes, model_version)
+                values (%s, %s, %s, %s, %s, %s)
                 """,
-                (vehicle_key, vin, score, buy_max, reasons or ["Heuristic"]),
+                (vehicle_key, vin, score, buy_max, reasons or ["Heuristic"], model_version),
             )
 
+# (vehicle_key, vin, score, buy_max, reasons, model_version, price, miles, dom, pivot)
+ScoreRow = Tuple[str, str, int, float, List[str], Optional[str], float, int, int, Optional[float]]
+
+def insert_scores_bulk(rows: List[ScoreRow]) -> None:
+    """
+    insert_score for a whole batch of rows, recording the model and inputs of each score.
+
+    One COPY on one connection, so the batch is written in a single round trip and a single
+    transaction (the scores_latest trigger also fires once). Raises if the batch is rejected;
+    on success the rows become the memoized latest scores of their VINs.
+    """
+    if not DB_ENABLED or not rows:
+        return
+    _LISTINGS_CACHE.invalidate()
+    error: Optional[Exception] = None
+    with get_db_connection() as conn:
+        if not conn:
+            raise RuntimeError("database unavailable")
+        try:
+            with conn.cursor() as cur:
+                with cur.copy(
+                    "copy scores (vehicle_key, vin, score, buy_max, reason_codes, model_version, price, miles, dom, pivot) from stdin"
+                ) as copy:
+                    for vehicle_key, vin, score, buy_max, reasons, model_version, price, miles, dom, pivot in rows:
+                        copy.write_row((vehicle_key, vin, score, buy_max, reasons or ["Heuristic"], model_version, price, miles, dom, pivot))
+        except Exception as e:
+            logging.error(f"Database error in insert_scores_bulk: {e}")
+            error = e
+    if error is not None:
+        raise error
+    # later rows for a VIN win, as in the scores_latest trigger
+    for _, vin, score, buy_max, reasons, model_version, price, miles, dom, pivot in rows:
+        _SCORE_MEMO.put(vin, (model_version, price, miles, dom, pivot, score, buy_max, reasons or ["Heuristic"]))
+
+def get_memoized_scores(
+    inputs: List[Tuple[str, float, int, int, float]], model_version: str,
+) -> dict[Tuple[str, float, int, int, float], Tuple[int, float, List[str]]]:
+    """
+    (score, buy_max, reasons) for each (vin, price, miles, dom, pivot) whose VIN's latest score
+    was computed by `model_version` from exactly those inputs, i.e. rows that need neither scoring
+    nor another scores row. The pivot is the price baseline the model resolves for the listing
+    now, so a comparables refresh that moves it misses the memo.
+
+    The in-process LRU is checked first and misses are read from scores_latest in one query.
+    Entries are replaced by this process's own writes; scores written by other processes are
+    picked up once an entry expires (SCORE_MEMO_TTL_SECONDS).
+    """
+    found: dict[Tuple[str, float, int, int, float], Tuple[int, float, List[str]]] = {}
+    missing: list[str] = []
+    for key in inputs:
+        entry = _SCORE_MEMO.get(key[0])
+        if entry is None:
+            missing.append(key[0])
+        elif entry[:5] == (model_version, *key[1:]):
+            found[key] = (entry[5], entry[6], list(entry[7]))
+    if not DB_ENABLED or not missing:
+        return found
+
+    with get_db_connection() as conn:
+        if not conn:
+            return found
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    select vin, model_version, price::float8, miles, dom, pivot, score, buy_max::float8, reason_codes
+                    from scores_latest
+                    where vin = any(%s)
+                """, (list(set(missing)),))
+                latest = {row[0]: row[1:] for row in cur.fetchall()}
+        except Exception as e:
+            logging.error(f"Database error in get_memoized_scores: {e}")
+            return found
+    for vin, entry in latest.items():
+        _SCORE_MEMO.put(vin, entry)
+    for key in inputs:
+        entry = latest.get(key[0])
+        if entry is not None and entry[:5] == (model_version, *key[1:]):
+            found[key] = (entry[5], entry[6], list(entry[7]))
+    return found
+
+def insert_shadow_scores(rows: List[Tuple[str, str, str, int, float, List[str], str, int]]) -> None:
+    """
+    Store shadow-model results next to the live ones for comparison.
+
+    Rows are (vehicle_key, vin, model_version, score, buy_max, reasons, live_model_version,
+    live_score). Meant to run as a background task after the response is sent, so failures are
+    logged and swallowed; scores_shadow feeds no reads, so the listing cache is left alone.
+    """
+    if not DB_ENABLED or not rows:
+        return
+    with get_db_connection() as conn:
+        if not conn:
+            return
+        try:
+            with conn.cursor() as cur:
+                with cur.copy(
+                    "copy scores_shadow (vehicle_key, vin, model_version, score, buy_max, reason_codes,"
+                    " live_model_version, live_score) from stdin"
+                ) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+        except Exception as e:
+            logging.error(f"Database error in insert_shadow_scores: {e}")
+
 
 # ============================================================================
 # VEHICLES REPOSITORY
 # ============================================================================
 
-def upsert_vehicle(vehicle_key: str, vin: str, year: int, make: str, model: str, trim: str | None):
+# Rewrites only vehicles whose attributes actually changed: an unchanged row produces no new
+# tuple version, no WAL and no vacuum work.
+_UPSERT_VEHICLES_SQL = """
+    insert into vehicles (vehicle_key, vin, year, make, model, trim)
+    select * from unnest(%s::text[], %s::text[], %s::int[], %s::text[], %s::text[], %s::text[])
+    on conflict (vehicle_key) do update
+    set vin = excluded.vin,
+        year = excluded.year,
+        make = excluded.make,
+        model = excluded.model,
+        trim = excluded.trim
+    where (vehicles.vin, vehicles.year, vehicles.make, vehicles.model, vehicles.trim)
+          is distinct from (excluded.vin, excluded.year, excluded.make, excluded.model, excluded.trim)
+"""
+
+def _vehicle_row(n: dict) -> tuple:
+    return (n["vehicle_key"], n["vin"], n["year"], n["make"], n["model"], n["trim"])
+
+def _upsert_vehicles(cur, rows: List[tuple]) -> None:
+    """Collapse (vehicle_key, vin, year, make, model, trim) rows to one per key (last wins) and upsert them in one statement."""
+    latest = {row[0]: row for row in rows}
+    if not latest:
+        return
+    cur.execute(_UPSERT_VEHICLES_SQL, [list(col) for col in zip(*latest.values())])
+
+def upsert_vehicles(rows: List[tuple]):
+    """Upsert many (vehicle_key, vin, year, make, model, trim) rows in one round trip."""
     if not DB_ENABLED:
         return
     with get_db_connection() as conn:
         if not conn:
             return
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                insert into vehicles (vehicle_key, vin, year, make, model, trim)
-                values (%s,%s,%s,%s,%s,%s)
-                on conflict (vehicle_key) do update
-                set vin = excluded.vin,
-                    year = excluded.year,
-                    make = excluded.make,
-                    model = excluded.model,
-                    trim = excluded.trim
-                """,
-                (vehicle_key, vin, year, make, model, trim),
-            )
+            _upsert_vehicles(cur, rows)
+
+def upsert_vehicle(vehicle_key: str, vin: str, year: int, make: str, model: str, trim: str | None):
+    upsert_vehicles([(vehicle_key, vin, year, make, model, trim)])
+
+def get_vehicle_attributes(keys: List[str]) -> dict[str, Tuple[Optional[int], Optional[str], Optional[str]]]:
+    """
+    (year, make, model) of the vehicles stored under `keys`, keyed by the vehicle_key or VIN that
+    matched, in one query; unknown keys are absent.
+    """
+    wanted = list(dict.fromkeys(k for k in keys if k))
+    if not wanted:
+        return {}
+    if not DB_ENABLED:
+        found: dict[str, Tuple[Optional[int], Optional[str], Optional[str]]] = {}
+        for l in _BY_ID.values():
+            for key in (l.vehicle_key, l.vin):
+                if key in wanted:
+                    found[key] = (l.year, l.make, l.model)
+        return found
+
+    with get_db_connection() as conn:
+        if not conn:
+            return {}
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    select vehicle_key, vin, year, make, model from vehicles
+                    where vehicle_key = any(%(keys)s) or vin = any(%(keys)s)
+                """, {"keys": wanted})
+                rows = cur.fetchall()
+        except Exception as e:
+            logging.error(f"Database error in get_vehicle_attributes: {e}")
+            return {}
+    found = {}
+    for vehicle_key, vin, year, make, model in rows:
+        for key in (vin, vehicle_key):  # an exact vehicle_key match wins over a VIN match
+            if key in wanted:
+                found[key] = (year, make, model)
+    return found
 
 
 # ============================================================================
@@ -521,11 +1352,7 @@ def get_trends_data(days_back: int = 30) -> dict:
                     COUNT(CASE WHEN s.score IS NOT NULL THEN 1 END) as scored_listings,
                     COUNT(CASE WHEN l.created_at < %s THEN 1 END) as aged_inventory
                 FROM listings l
-                LEFT JOIN (
-                    SELECT DISTINCT ON (vin) vin, score
-                    FROM scores
-                    ORDER BY vin, created_at DESC
-                ) s ON s.vin = l.vin
+                LEFT JOIN scores_latest s ON s.vin = l.vin
                 WHERE l.created_at >= %s
             """, (now - datetime.timedelta(days=30), current_start))
             
@@ -543,11 +1370,7 @@ def get_trends_data(days_back: int = 30) -> dict:
                     COUNT(CASE WHEN s.score IS NOT NULL THEN 1 END) as scored_listings,
                     COUNT(CASE WHEN l.created_at < %s THEN 1 END) as aged_inventory
                 FROM listings l
-                LEFT JOIN (
-                    SELECT DISTINCT ON (vin) vin, score
-                    FROM scores
-                    ORDER BY vin, created_at DESC
-                ) s ON s.vin = l.vin
+                LEFT JOIN scores_latest s ON s.vin = l.vin
                 WHERE l.created_at >= %s AND l.created_at < %s
             """, (now - datetime.timedelta(days=30), previous_start, previous_end))
             
@@ -665,11 +1488,7 @@ def get_kpi_metrics() -> dict:
                     COUNT(CASE WHEN l.created_at < %s THEN 1 END) as aged_inventory,
                     COALESCE(AVG(EXTRACT(EPOCH FROM (NOW() - l.created_at)) / 86400), 0) as avg_days_since_creation
                 FROM listings l
-                LEFT JOIN (
-                    SELECT DISTINCT ON (vin) vin, score
-                    FROM scores
-                    ORDER BY vin, created_at DESC
-                ) s ON s.vin = l.vin
+                LEFT JOIN scores_latest s ON s.vin = l.vin
             """, (thirty_days_ago,))
             
             result = cur.fetchone()
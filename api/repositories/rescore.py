@@ -0,0 +1,69 @@
+import datetime
+import logging
+from typing import List, Optional, Tuple
+from ..core.db import DB_ENABLED
+from ..core.db_helpers import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# Rescoring of active inventory (api.jobs.rescore)
+# -----------------------------------------------------------------------------
+
+# (listing id, vehicle_key, vin, price, miles, effective dom, source, year, make, model,
+#  latest model_version, latest score, latest buy_max, latest reason_codes, latest pivot)
+RescoreRow = Tuple[int, str, str, float, int, int, Optional[str], Optional[int], Optional[str], Optional[str],
+                   Optional[str], int, float, List[str], Optional[float]]
+
+def fetch_rescore_chunk(after_id: int, limit: int, as_of: datetime.datetime, active_since: datetime.datetime) -> Tuple[int, List[RescoreRow]]:
+    """
+    Scored active listings among the `limit` listing ids after `after_id`.
+
+    Returns the last id walked (`after_id` when the walk is over) and the listings in that id range
+    that are the newest for their vehicle, were seen since `active_since` and whose latest score came
+    from a scoring model. Feed-decision placeholder scores record no model and are left alone.
+    The effective dom is the ingested dom plus whole days between created_at and `as_of`.
+    """
+    if not DB_ENABLED:
+        return after_id, []
+    result: Tuple[int, List[RescoreRow]] = (after_id, [])
+    error: Optional[Exception] = None
+    with get_db_connection() as conn:
+        if not conn:
+            error = RuntimeError("database unavailable")
+        else:
+            try:
+                with conn.cursor() as cur:
+                    # the id range is bounded first so a sparse stretch of inactive listings still advances
+                    cur.execute("""
+                        select coalesce(max(id), %(after)s) from (
+                            select id from listings where id > %(after)s order by id limit %(limit)s
+                        ) ids
+                    """, {"after": after_id, "limit": limit})
+                    last_id = cur.fetchone()[0]
+                    if last_id != after_id:
+                        cur.execute("""
+                            select l.id, l.vehicle_key, l.vin, coalesce(l.price, 0)::float8, coalesce(l.miles, 0),
+                                   coalesce(l.dom, 0) + greatest(0, floor(extract(epoch from (%(as_of)s - l.created_at)) / 86400))::int,
+                                   l.source, v.year, v.make, v.model,
+                                   s.model_version, s.score, s.buy_max::float8, s.reason_codes, s.pivot
+                            from listings l
+                            join scores_latest s on s.vin = l.vin
+                            left join vehicles v on v.vehicle_key = l.vehicle_key
+                            where l.id > %(after)s and l.id <= %(last)s
+                              and l.last_seen_at >= %(active_since)s
+                              and s.model_version is not null
+                              and not exists (
+                                  select 1 from listings newer
+                                  where newer.vehicle_key = l.vehicle_key
+                                    and (newer.created_at, newer.id) > (l.created_at, l.id)
+                              )
+                            order by l.id
+                        """, {"after": after_id, "last": last_id, "as_of": as_of, "active_since": active_since})
+                        result = (last_id, cur.fetchall())
+            except Exception as e:
+                logger.error("Error in fetch_rescore_chunk: %s", e, exc_info=True)
+                error = e
+    if error is not None:
+        raise error
+    return result
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query, Request, Response, Header
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
+from typing import Iterator, List, Literal, Optional
+import hashlib
+import time
 from datetime import datetime
-from ..schemas.listing import ListingIn, ListingOut, ListingScoreIn
+from uuid import UUID
+from ..schemas.listing import LISTING_SORTS, ListingFilters, ListingIn, ListingOut, ListingPage, ListingScoreIn
 from ..schemas.notify import NotifyItem, NotifyResponse
 from ..schemas.scoring import ScoreResponse
 from ..schemas.kpi import KpiResponse, KpiMetrics
-from ..repositories.repositories import ingest_listings, list_listings, list_listings_by_buyer, get_buyer_stats, update_cached_score, insert_score, get_trends_data, get_kpi_metrics
+from ..schemas.ingest import IngestJobAccepted, IngestJobOut, IngestReport
+from ..repositories.repositories import ingest_listings_report, get_idempotent_response, store_idempotent_response, list_listings_page, list_listings_by_buyer_page, iter_listings, parse_listing_fields, iter_listings_by_buyer, get_buyer_stats, update_cached_score, get_vehicle_attributes, insert_scores_bulk, insert_shadow_scores, get_memoized_scores, get_trends_data, get_kpi_metrics, get_data_version
+from ..repositories.ingest_jobs import enqueue_ingest_job, get_ingest_job
 from ..core.auth import get_current_user
 from ..schemas.user import UserOut
-from ..services.services import score_listing, notify as do_notify
+from ..core.config import settings
+from ..services.services import notify as do_notify
+from ..services.batch_scoring import score_models
+from ..services.scoring_models import scoring_models
+from ..services.ingest_service import DuplexStreamingResponse, NDJSON_MEDIA_TYPE, stream_ingest
 
 # Create routers for each endpoint group
 ingest_router = APIRouter(prefix="/ingest", tags=["ingest"])
@@ -19,26 +32,227 @@ trends_router = APIRouter(prefix="/trends", tags=["trends"])
 kpi_router = APIRouter(prefix="/kpi", tags=["kpi"])
 
 # Ingest routes
-@ingest_router.post("", include_in_schema=False, response_model=List[ListingOut])  # /api/ingest
-@ingest_router.post("/", response_model=List[ListingOut])  # /api/ingest/
-def ingest(listings: List[ListingIn], current_user: UserOut = Depends(get_current_user)):
-    return ingest_listings(listings, buyer_id=str(current_user.id))
+
+# /api/ingest reads the raw body and validates it in one pass (JSON parsing and model
+# validation both happen inside pydantic-core), instead of FastAPI's json.loads followed by
+# validation of the resulting Python objects.
+_LISTINGS_ADAPTER = TypeAdapter(List[ListingIn])
+
+# documents the body FastAPI no longer sees; Decision is already published via ListingOut
+_LISTING_IN_SCHEMA = ListingIn.model_json_schema(ref_template="#/components/schemas/{model}")
+_LISTING_IN_SCHEMA.pop("$defs", None)
+_INGEST_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"type": "array", "items": _LISTING_IN_SCHEMA}}},
+    }
+}
+
+async def parse_listings_body(request: Request) -> List[ListingIn]:
+    """Validate a JSON array body into ListingIn models, raising FastAPI's usual 422 on failure."""
+    try:
+        return _LISTINGS_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
+
+@ingest_router.post("", include_in_schema=False, response_model=IngestReport, openapi_extra=_INGEST_OPENAPI)  # /api/ingest
+@ingest_router.post("/", response_model=IngestReport, openapi_extra=_INGEST_OPENAPI)  # /api/ingest/
+async def ingest(
+    listings: List[ListingIn] = Depends(parse_listings_body),
+    mode: str = Query("sync", pattern="^(sync|async)$", description="async: queue the batch and return 202 with a job id"),
+    score: bool = Query(False, description="Score every row during ingest and return scored listings"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Ingest a batch. Returns {listings, errors}: the stored listings in input order and one error
+    per row that was not stored, carrying the row's index in the batch.
+    """
+    buyer_id = str(current_user.id)
+    if idempotency_key:
+        stored = await run_in_threadpool(get_idempotent_response, idempotency_key, buyer_id)
+        if stored:
+            status_code, body = stored
+            return JSONResponse(status_code=status_code, content=body, headers={"Idempotent-Replayed": "true"})
+
+    if mode == "async":
+        job_id = await run_in_threadpool(enqueue_ingest_job, listings, buyer_id=buyer_id, score=score)
+        if job_id is None:
+            raise HTTPException(status_code=503, detail="Ingest queue unavailable")
+        status_code = 202
+        body = IngestJobAccepted(job_id=job_id, status="queued", total=len(listings)).model_dump(mode="json")
+    else:
+        status_code = 200
+        scorer = scoring_models.live() if score else None
+        result = await run_in_threadpool(ingest_listings_report, listings, buyer_id=buyer_id, scorer=scorer)
+        body = result.model_dump(mode="json")
+        # rows that failed for a transient reason must be ingested by a retry under the same key,
+        # so that response is not replayed
+        if any(e.retryable for e in result.errors):
+            idempotency_key = None
+
+    if idempotency_key:
+        await run_in_threadpool(store_idempotent_response, idempotency_key, buyer_id, status_code, body)
+    return JSONResponse(status_code=status_code, content=body)
+
+@ingest_router.get("/jobs/{job_id}", response_model=IngestJobOut)  # /api/ingest/jobs/{id}
+def get_ingest_job_status(job_id: UUID, current_user: UserOut = Depends(get_current_user)):
+    """Progress and per-row errors of an asynchronous ingest job"""
+    found = get_ingest_job(job_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    job, owner_id = found
+    if current_user.role != "admin" and owner_id != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job
+
+@ingest_router.post("/stream")  # /api/ingest/stream
+async def ingest_stream(
+    request: Request,
+    chunk_size: int = Query(settings.INGEST_STREAM_CHUNK_SIZE, ge=1, le=10_000, description="Rows validated and committed per chunk"),
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$", description="Body format (default: from Content-Type, else ndjson)"),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """Ingest a newline-delimited JSON or CSV upload incrementally, streaming one NDJSON summary per committed chunk"""
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    return DuplexStreamingResponse(
+        stream_ingest(request.stream(), fmt, buyer_id=str(current_user.id), chunk_size=chunk_size),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+# Conditional GET: read endpoints tag responses with the data version plus a digest of the
+# request, so a poller sending If-None-Match gets a 304 after one lookup instead of the query.
+def _data_etag(request: Request, *extra: object) -> Optional[str]:
+    version = get_data_version()
+    if version is None:
+        return None
+    variant = f"{request.url.path}?{request.url.query}|{request.headers.get('accept', '')}|{extra}"
+    return f'W/"{version}-{hashlib.sha1(variant.encode("utf-8")).hexdigest()[:16]}"'
+
+def _etag_matches(request: Request, etag: Optional[str]) -> bool:
+    if not etag:
+        return False
+    header = request.headers.get("if-none-match", "")
+    # weak comparison: W/ prefixes are ignored on both sides
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+def _etag_headers(etag: Optional[str]) -> dict:
+    # no-cache: browsers may store the body but must revalidate it on every poll
+    return {"ETag": etag, "Cache-Control": "private, no-cache"} if etag else {}
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=_etag_headers(etag))
 
 # Listings routes
+_NDJSON_FLUSH_ROWS = 100
+
+def _wants_stream(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def _ndjson_response(items: Iterator[ListingOut], sparse: bool = False, etag: Optional[str] = None) -> StreamingResponse:
+    """Serialize listings to NDJSON as they arrive, flushing every _NDJSON_FLUSH_ROWS rows."""
+    def body() -> Iterator[bytes]:
+        lines: list[str] = []
+        for item in items:
+            lines.append(item.model_dump_json(exclude_unset=sparse))
+            if len(lines) >= _NDJSON_FLUSH_ROWS:
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE, headers=_etag_headers(etag))
+
+# Listing rows are built with model_construct from typed SQL columns; serializing them here,
+# rather than through response_model, skips FastAPI's second validation pass.
+_LISTINGS_OUT_ADAPTER = TypeAdapter(List[ListingOut])
+
+def _page_response(page: ListingPage, sparse: bool = False, etag: Optional[str] = None) -> Response:
+    """Body stays a plain array; pagination metadata travels in headers. Sparse rows omit unrequested fields."""
+    headers = _etag_headers(etag)
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if page.total_estimate is not None:
+        headers["X-Total-Estimate"] = str(page.total_estimate)
+    return Response(content=_LISTINGS_OUT_ADAPTER.dump_json(page.items, exclude_unset=sparse), media_type="application/json", headers=headers)
+
+def listing_filters(
+    make: Optional[str] = Query(None, description="Make (case-insensitive)"),
+    model: Optional[str] = Query(None, description="Model (case-insensitive)"),
+    year_min: Optional[int] = Query(None, description="Minimum model year"),
+    year_max: Optional[int] = Query(None, description="Maximum model year"),
+    price_min: Optional[float] = Query(None, ge=0, description="Minimum price"),
+    price_max: Optional[float] = Query(None, ge=0, description="Maximum price"),
+    miles_min: Optional[int] = Query(None, ge=0, description="Minimum miles"),
+    miles_max: Optional[int] = Query(None, ge=0, description="Maximum miles"),
+    min_score: Optional[int] = Query(None, ge=0, le=100, description="Minimum latest score"),
+    source: Optional[str] = Query(None, description="Listing source"),
+    status: Optional[str] = Query(None, description="Decision status"),
+    start_date: Optional[datetime] = Query(None, description="Created at or after (ISO format)"),
+    end_date: Optional[datetime] = Query(None, description="Created at or before (ISO format)"),
+    sort: Literal[LISTING_SORTS] = Query("newest", description="newest, oldest, or price/miles/year/score; prefix '-' for descending"),
+) -> ListingFilters:
+    return ListingFilters(
+        make=make, model=model, year_min=year_min, year_max=year_max, price_min=price_min, price_max=price_max,
+        miles_min=miles_min, miles_max=miles_max, min_score=min_score, source=source, status=status,
+        start_date=start_date, end_date=end_date, sort=sort,
+    )
+
 @listings_router.get("", include_in_schema=False, response_model=List[ListingOut])  # /api/listings
 @listings_router.get("/", response_model=List[ListingOut])  # /api/listings/
-def list_(limit: Optional[int] = Query(None, ge=1, description="Number of records to fetch (default: all)")):
-    return list_listings(limit=limit)
+def list_(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Number of records to fetch (default: all)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    buyer_id: Optional[str] = Query(None, description="Only listings of this buyer"),
+    stream: bool = Query(False, description="Stream rows as NDJSON (also selected by Accept: application/x-ndjson)"),
+    fields: Optional[str] = Query(None, description="Comma-separated ListingOut fields to return (default: all)"),
+    filters: ListingFilters = Depends(listing_filters),
+):
+    """Newest listing per vehicle, filtered and sorted server-side. With `limit`, X-Next-Cursor is set while more pages remain."""
+    filters.buyer_id = buyer_id
+    etag = _data_etag(request)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    try:
+        selected = parse_listing_fields(fields)
+        if _wants_stream(request, stream):
+            return _ndjson_response(
+                iter_listings(limit=limit, cursor=cursor, filters=filters, fields=selected),
+                sparse=bool(selected), etag=etag,
+            )
+        page = list_listings_page(limit=limit, cursor=cursor, filters=filters, fields=selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _page_response(page, sparse=bool(selected), etag=etag)
 
 @listings_router.get("/buyer/{buyer_id}", response_model=List[ListingOut])
 def list_by_buyer(
     buyer_id: str,
-    start_date: Optional[datetime] = Query(None, description="Start date for filtering (ISO format)"),
-    end_date: Optional[datetime] = Query(None, description="End date for filtering (ISO format)"),
-    limit: Optional[int] = Query(None, ge=1, description="Number of records to fetch (default: all)")
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Number of records to fetch (default: all)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    stream: bool = Query(False, description="Stream rows as NDJSON (also selected by Accept: application/x-ndjson)"),
+    fields: Optional[str] = Query(None, description="Comma-separated ListingOut fields to return (default: all)"),
+    filters: ListingFilters = Depends(listing_filters),
 ):
-    """Get listings for a specific buyer with optional date filtering"""
-    return list_listings_by_buyer(buyer_id, start_date, end_date, limit)
+    """Get listings for a specific buyer with optional filtering"""
+    etag = _data_etag(request)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    try:
+        selected = parse_listing_fields(fields)
+        if _wants_stream(request, stream):
+            return _ndjson_response(
+                iter_listings_by_buyer(buyer_id, limit=limit, cursor=cursor, filters=filters, fields=selected),
+                sparse=bool(selected), etag=etag,
+            )
+        page = list_listings_by_buyer_page(buyer_id, limit=limit, cursor=cursor, filters=filters, fields=selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _page_response(page, sparse=bool(selected), etag=etag)
 
 @listings_router.get("/buyer/{buyer_id}/stats")
 def get_buyer_performance_stats(
@@ -52,15 +266,55 @@ def get_buyer_performance_stats(
 # Score routes
 @score_router.post("", include_in_schema=False, response_model=List[ScoreResponse])  # /api/score
 @score_router.post("/", response_model=List[ScoreResponse])  # /api/score/
-def score(payload: List[ListingScoreIn]):
+def score(payload: List[ListingScoreIn], background_tasks: BackgroundTasks):
+    live, shadow = scoring_models.live(), scoring_models.shadow()
+    vin_keys = [item.vin.strip().upper() if item.vin and item.vin.strip() else None for item in payload]
+    # items sent without year/make/model take them from the stored vehicle, so the comparables
+    # baseline is the same one ingest and the rescore job use
+    partial = [i for i, item in enumerate(payload) if item.year is None or item.make is None or item.model is None]
+    if partial:
+        stored = get_vehicle_attributes([key for i in partial for key in (payload[i].vehicle_key, vin_keys[i])])
+        for i in partial:
+            item = payload[i]
+            attrs = stored.get(item.vehicle_key) or stored.get(vin_keys[i])
+            if attrs:
+                year, make, model = attrs
+                payload[i] = item.model_copy(update={
+                    "year": item.year if item.year is not None else year,
+                    "make": item.make if item.make is not None else make,
+                    "model": item.model if item.model is not None else model,
+                })
+    keys = [(vin_key, item.price, item.miles, item.dom, live.pivot(item)) for item, vin_key in zip(payload, vin_keys)]
+    # VINs whose latest score came from the live model, these exact inputs and the same price
+    # baseline are not rescored
+    memo = get_memoized_scores([key for key in keys if key[0]], live.version)
+    pending = [i for i, key in enumerate(keys) if key not in memo]
+    # the shadow model, if configured, is scored in the same pass over the batch columns
+    results = score_models([payload[i] for i in pending], [live, shadow] if shadow else [live])
+    scored = dict(zip(pending, results[0]))
+
     out: list[ScoreResponse] = []
-    for item in payload:
-        score_val, buy_max, reasons = score_listing(item)
-        vin_key = item.vin.strip().upper() if item.vin and item.vin.strip() else None
-        if vin_key:
-            insert_score(item.vehicle_key, vin_key, score_val, buy_max, reasons)
-            update_cached_score(vin_key, score_val, buy_max, reasons)
+    rows: list[tuple] = []
+    shadow_rows: list[tuple] = []
+    latest: dict[str, tuple] = {}  # VIN -> inputs of its latest scores row, counting rows queued below
+    for i, (item, key) in enumerate(zip(payload, keys)):
+        score_val, buy_max, reasons = scored[i] if i in scored else memo[key]
+        vin_key = key[0]
+        # a row is written only when it changes the VIN's latest inputs
+        if vin_key and latest.setdefault(vin_key, None if i in scored else key) != key:
+            latest[vin_key] = key
+            rows.append((item.vehicle_key, vin_key, score_val, buy_max, reasons, live.version, *key[1:]))
         out.append(ScoreResponse(vehicle_key=item.vehicle_key, vin=item.vin, score=score_val, buyMax=buy_max, reasonCodes=reasons))
+    if shadow:
+        for i, (s_score, s_buy_max, s_reasons) in zip(pending, results[1]):
+            shadow_rows.append((payload[i].vehicle_key, vin_keys[i], shadow.version, s_score, s_buy_max, s_reasons, live.version, scored[i][0]))
+    # one COPY for the whole batch rather than a pooled round trip per item
+    insert_scores_bulk(rows)
+    for _, vin_key, score_val, buy_max, reasons, *_ in rows:
+        update_cached_score(vin_key, score_val, buy_max, reasons)
+    if shadow_rows:
+        # written after the response is sent, so shadow scoring adds no request latency
+        background_tasks.add_task(insert_shadow_scores, shadow_rows)
     return out
 
 # Notify routes
@@ -79,11 +333,18 @@ def get_trends(days_back: int = Query(30, ge=7, le=90, description="Number of da
 # KPI routes
 @kpi_router.get("", include_in_schema=False, response_model=KpiResponse)  # /api/kpi
 @kpi_router.get("/", response_model=KpiResponse)  # /api/kpi/
-def get_kpi_metrics_endpoint(current_user: UserOut = Depends(get_current_user)):
+def get_kpi_metrics_endpoint(request: Request, response: Response, current_user: UserOut = Depends(get_current_user)):
     """Get comprehensive KPI metrics for the dashboard"""
+    # aged inventory and lead time move with the clock, so the tag also rolls over on a time bucket;
+    # without a bucket length the KPIs are not tagged at all rather than tagged by data version alone
+    max_age = settings.KPI_ETAG_MAX_AGE_SECONDS
+    etag = _data_etag(request, int(time.time() // max_age)) if max_age > 0 else None
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     try:
         metrics_data = get_kpi_metrics()
         metrics = KpiMetrics(**metrics_data)
+        response.headers.update(_etag_headers(etag))
         return KpiResponse(metrics=metrics, success=True)
     except Exception as e:
         return KpiResponse(
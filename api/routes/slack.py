@@ -5,7 +5,7 @@ from ..schemas.user import UserOut
 from ..core.auth import get_current_user
 from ..services.slack_service import slack_service
 from ..services.slack_workflow_service import slack_workflow_service
-from ..repositories.repositories import list_listings
+from ..repositories.repositories import get_listing_by_vehicle_key, get_listings_by_vehicle_keys
 
 # Create router for Slack notifications
 slack_router = APIRouter(prefix="/slack", tags=["slack"])
@@ -18,8 +18,7 @@ async def send_slack_notification(
     """Send a vehicle listing notification to Slack"""
     
     # Find the listing by vehicle_key
-    listings = list_listings()  # Get all listings to find the specific one
-    listing = next((l for l in listings if l.vehicle_key == request.vehicle_key), None)
+    listing = get_listing_by_vehicle_key(request.vehicle_key)
     
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
@@ -36,9 +35,8 @@ async def send_batch_slack_notifications(
 ):
     """Send multiple vehicle listing notifications to Slack"""
     
-    # Get all listings
-    listings = list_listings()
-    listing_map = {l.vehicle_key: l for l in listings}
+    # Get the requested listings
+    listing_map = get_listings_by_vehicle_keys([request.vehicle_key for request in requests])
     
     results = []
     for request in requests:
@@ -66,8 +64,7 @@ async def trigger_slack_workflow(
     """Trigger a Slack workflow with auto-populated form data"""
     
     # Find the listing by vehicle_key
-    listings = list_listings()  # Get all listings to find the specific one
-    listing = next((l for l in listings if l.vehicle_key == request.vehicle_key), None)
+    listing = get_listing_by_vehicle_key(request.vehicle_key)
     
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
@@ -84,9 +81,8 @@ async def trigger_batch_slack_workflows(
 ):
     """Trigger multiple Slack workflows with auto-populated form data"""
     
-    # Get all listings
-    listings = list_listings()
-    listing_map = {l.vehicle_key: l for l in listings}
+    # Get the requested listings
+    listing_map = get_listings_by_vehicle_keys([request.vehicle_key for request in requests])
     
     results = []
     for request in requests:
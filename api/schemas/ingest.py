@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Optional, List
+from uuid import UUID
+from pydantic import BaseModel
+from .listing import ListingOut
+
+class IngestRowError(BaseModel):
+    index: Optional[int] = None   # position in the submitted batch
+    line: Optional[int] = None    # 1-based source line for streamed uploads
+    vin: Optional[str] = None
+    error: str
+    retryable: bool = False       # the row was not written for a transient reason; resend it
+
+class IngestReport(BaseModel):
+    """/api/ingest response: stored listings in input order plus one error per row that was not stored"""
+    listings: List[ListingOut]
+    errors: List[IngestRowError] = []
+
+class IngestChunkSummary(BaseModel):
+    """One NDJSON line emitted by /api/ingest/stream per committed chunk"""
+    chunk: int
+    accepted: int
+    rejected: int
+    ids: List[str] = []
+    errors: List[IngestRowError] = []
+
+class IngestJobAccepted(BaseModel):
+    """202 body for /api/ingest?mode=async"""
+    job_id: UUID
+    status: str
+    total: int
+
+class IngestJobOut(BaseModel):
+    id: UUID
+    status: str                # queued | running | done | failed
+    total: int
+    processed: int
+    accepted: int
+    rejected: int
+    errors: List[IngestRowError] = []
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import BaseModel, Field
 
 class Decision(BaseModel):
@@ -49,6 +49,32 @@ class ListingOut(BaseModel):
     buyer_username: Optional[str] = None
     decision: Optional[Decision] = None
 
+LISTING_SORTS = ("newest", "oldest", "price", "-price", "miles", "-miles", "year", "-year", "score", "-score")
+
+class ListingFilters(BaseModel):
+    """Query-string filters for listing reads; every field is optional and they combine with AND"""
+    make: Optional[str] = None               # case-insensitive exact match
+    model: Optional[str] = None              # case-insensitive exact match
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    miles_min: Optional[int] = None
+    miles_max: Optional[int] = None
+    min_score: Optional[int] = Field(None, ge=0, le=100)
+    source: Optional[str] = None
+    status: Optional[str] = None
+    buyer_id: Optional[str] = None
+    start_date: Optional[datetime] = None    # created_at >= start_date
+    end_date: Optional[datetime] = None      # created_at <= end_date
+    sort: Literal[LISTING_SORTS] = "newest"  # "-" prefix sorts descending
+
+class ListingPage(BaseModel):
+    """One keyset page of listings, newest first"""
+    items: List[ListingOut]
+    next_cursor: Optional[str] = None      # opaque; pass back as ?cursor= for the next page
+    total_estimate: Optional[int] = None   # planner estimate, not an exact count
+
 class ListingScoreIn(BaseModel):
     vehicle_key: str
     vin: Optional[str] = None
@@ -56,3 +82,7 @@ class ListingScoreIn(BaseModel):
     miles: int
     dom: int
     source: Optional[str] = None
+    # price comparables key; without it the flat baseline of the scoring model applies
+    year: Optional[int] = None
+    make: Optional[str] = None
+    model: Optional[str] = None
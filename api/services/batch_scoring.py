@@ -0,0 +1,112 @@
+"""
+Vectorized counterpart of services.score_listing for large batches.
+
+score_arrays() evaluates a ScoringModel over columnar price/miles/dom arrays and returns
+reason codes as bitmasks; score_models() wraps it for a list of ListingScoreIn, building the
+columns once for every model it is given (live and shadow), and falls back to the scalar
+function for small batches or when numpy is not installed. Results are identical to
+score_listing, including round(buy_max, 2) (see _round2).
+"""
+from typing import List, Optional, Sequence, Tuple
+from ..core.config import settings
+from ..schemas.listing import ListingScoreIn
+from .scoring_models import ScoringModel, scoring_models
+from .services import score_listing
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore
+
+# Bit per reason code, in the order score_listing appends them
+REASON_CODES = ("PriceVsBaseline", "LowDOM", "LowMiles", "AgedInventory")
+PRICE_VS_BASELINE, LOW_DOM, LOW_MILES, AGED_INVENTORY = (1 << i for i in range(len(REASON_CODES)))
+
+_REASONS_BY_MASK = [
+    [code for bit, code in enumerate(REASON_CODES) if mask & (1 << bit)] or ["Heuristic"]
+    for mask in range(1 << len(REASON_CODES))
+]
+
+
+def reasons_from_mask(mask: int) -> List[str]:
+    """Reason codes for a bitmask, as score_listing lists them."""
+    return list(_REASONS_BY_MASK[mask])
+
+
+def _round2(values: "np.ndarray") -> "np.ndarray":
+    """
+    round(x, 2) elementwise with Python's result.
+
+    np.round scales by 100 and rounds half to even on the scaled value, while Python rounds the
+    exact binary value; they can only disagree when x * 100 lands next to a .5 boundary, so
+    those few elements are redone with the builtin.
+    """
+    scaled = values * 100
+    out = np.round(scaled) / 100
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ties:
+        out[i] = round(float(values[i]), 2)
+    return out
+
+
+def score_arrays(
+    price: "np.ndarray", miles: "np.ndarray", dom: "np.ndarray", model: Optional[ScoringModel] = None,
+    pivot: Optional["np.ndarray"] = None,
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    (score int64, buy_max float64, reason bitmask uint8) per row; see ScoringModel for the rules.
+
+    `pivot` is the per-row baseline price (ScoringModel.pivot); by default the model's flat price_pivot.
+    """
+    m = model or scoring_models.live()
+    pivot = np.float64(m.price_pivot) if pivot is None else np.asarray(pivot, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    miles = np.asarray(miles, dtype=np.int64)
+    dom = np.asarray(dom, dtype=np.int64)
+
+    dom_penalty = np.maximum(0, m.dom_window - dom) / m.dom_window
+    miles_penalty = np.maximum(0, m.miles_window - miles) / m.miles_window
+    base = m.dom_weight * dom_penalty + m.miles_weight * miles_penalty
+
+    below_baseline = price < pivot
+    price_boost = np.where(below_baseline, np.minimum(m.price_boost_cap, (pivot - price) / m.price_boost_step), 0.0)
+    scores = np.clip(base + price_boost, 0, 100).astype(np.int64)  # int() truncates; values are >= 0
+
+    aged = dom > m.aged_dom
+    buy_max = _round2(np.where(aged, price * m.aged_buy_max_factor, np.maximum(0.0, price * m.buy_max_factor)))
+
+    masks = (
+        below_baseline * np.uint8(PRICE_VS_BASELINE)
+        | (dom < m.low_dom) * np.uint8(LOW_DOM)
+        | (miles < m.low_miles) * np.uint8(LOW_MILES)
+        | aged * np.uint8(AGED_INVENTORY)
+    ).astype(np.uint8)
+    return scores, buy_max, masks
+
+
+def score_models(
+    items: Sequence[ListingScoreIn], models: Sequence[ScoringModel],
+) -> List[List[Tuple[int, float, List[str]]]]:
+    """score_listing under each of `models` for every item, vectorized once the batch reaches SCORE_BATCH_THRESHOLD."""
+    if np is None or len(items) < settings.SCORE_BATCH_THRESHOLD:
+        return [[score_listing(item, model) for item in items] for model in models]
+
+    n = len(items)
+    price = np.fromiter((item.price for item in items), dtype=np.float64, count=n)
+    miles = np.fromiter((item.miles for item in items), dtype=np.int64, count=n)
+    dom = np.fromiter((item.dom for item in items), dtype=np.int64, count=n)
+    results = []
+    for model in models:
+        # comparables baselines are dict lookups, one per row
+        pivot = np.fromiter((model.pivot(item) for item in items), dtype=np.float64, count=n) if model.comparables else None
+        scores, buy_max, masks = score_arrays(price, miles, dom, model, pivot)
+        results.append([
+            (score, bm, reasons_from_mask(mask))
+            for score, bm, mask in zip(scores.tolist(), buy_max.tolist(), masks.tolist())
+        ])
+    return results
+
+
+def score_batch(items: Sequence[ListingScoreIn], model: Optional[ScoringModel] = None) -> List[Tuple[int, float, List[str]]]:
+    """score_listing for every item under `model` (default: the live model)."""
+    return score_models(items, [model or scoring_models.live()])[0]
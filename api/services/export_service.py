@@ -125,17 +125,17 @@ class ExportService:
                 25 as radius,
                 s.reason_codes,
                 s.buy_max,
-                'active' as status,
+                l.status,
                 l.location,
                 l.buyer_id,
                 u.username as buyer_username,
                 l.created_at,
-                s.buy_max as decision_buy_max,
-                'pending' as decision_status,
-                s.reason_codes as decision_reasons
+                l.decision_buy_max,
+                l.status as decision_status,
+                l.decision_reasons
             FROM listings l
             LEFT JOIN vehicles v ON l.vehicle_key = v.vehicle_key
-            LEFT JOIN v_latest_scores s ON l.vehicle_key = s.vehicle_key
+            LEFT JOIN scores_latest s ON s.vin = l.vin
             LEFT JOIN users u ON l.buyer_id::uuid = u.id
         """
         
@@ -179,17 +179,17 @@ class ExportService:
                 25 as radius,
                 s.reason_codes,
                 s.buy_max,
-                'active' as status,
+                l.status,
                 l.location,
                 l.buyer_id,
                 u.username as buyer_username,
                 l.created_at,
-                s.buy_max as decision_buy_max,
-                'pending' as decision_status,
-                s.reason_codes as decision_reasons
+                l.decision_buy_max,
+                l.status as decision_status,
+                l.decision_reasons
             FROM listings l
             LEFT JOIN vehicles v ON l.vehicle_key = v.vehicle_key
-            LEFT JOIN v_latest_scores s ON l.vehicle_key = s.vehicle_key
+            LEFT JOIN scores_latest s ON s.vin = l.vin
             LEFT JOIN users u ON l.buyer_id::uuid = u.id
             WHERE l.buyer_id::uuid = %s
         """
@@ -233,17 +233,17 @@ class ExportService:
                 25 as radius,
                 s.reason_codes,
                 s.buy_max,
-                'active' as status,
+                l.status,
                 l.location,
                 l.buyer_id,
                 u.username as buyer_username,
                 l.created_at,
-                s.buy_max as decision_buy_max,
-                'pending' as decision_status,
-                s.reason_codes as decision_reasons
+                l.decision_buy_max,
+                l.status as decision_status,
+                l.decision_reasons
             FROM listings l
             LEFT JOIN vehicles v ON l.vehicle_key = v.vehicle_key
-            LEFT JOIN v_latest_scores s ON l.vehicle_key = s.vehicle_key
+            LEFT JOIN scores_latest s ON s.vin = l.vin
             LEFT JOIN users u ON l.buyer_id::uuid = u.id
             WHERE l.id = ANY(%s)
         """
@@ -0,0 +1,152 @@
+import csv
+import json
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from ..schemas.ingest import IngestChunkSummary, IngestReport, IngestRowError
+from ..schemas.listing import ListingIn
+from ..repositories.repositories import ingest_listings_report
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# CSV columns that hold lists; values are either a JSON array or "A|B|C"
+_CSV_LIST_FIELDS = {"reasonCodes"}
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that may keep reading the request body while it streams.
+
+    Starlette's StreamingResponse consumes `receive()` to watch for disconnects, which would
+    swallow body messages still in flight. Here the generator owns `receive()` through
+    `request.stream()`, and a disconnect surfaces there as ClientDisconnect instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def format_validation_error(e: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a single readable line."""
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+    )
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into (line_no, text) pairs without buffering more than one line."""
+    buf = b""
+    line_no = 0
+    async for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for raw in lines:
+            line_no += 1
+            yield line_no, raw.decode("utf-8-sig" if line_no == 1 else "utf-8").rstrip("\r")
+    if buf:
+        line_no += 1
+        yield line_no, buf.decode("utf-8-sig" if line_no == 1 else "utf-8").rstrip("\r")
+
+
+def csv_record(header: List[str], values: List[str]) -> dict:
+    """Map one CSV row onto ListingIn fields; blank cells are omitted so model defaults apply."""
+    record: dict = {}
+    for key, value in zip(header, values):
+        if value == "":
+            continue
+        if key in _CSV_LIST_FIELDS:
+            value = json.loads(value) if value.startswith("[") else [v for v in value.split("|") if v]
+        record[key] = value
+    return record
+
+
+async def iter_records(lines: AsyncIterator[Tuple[int, str]], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yield (line_no, record, error) for every non-blank data line.
+
+    CSV input is parsed one physical line at a time, so quoted fields must not contain newlines.
+    """
+    header: Optional[List[str]] = None
+    async for line_no, text in lines:
+        if not text.strip():
+            continue
+        try:
+            if fmt == "csv":
+                values = next(csv.reader([text]))
+                if header is None:
+                    header = [h.strip() for h in values]
+                    continue
+                yield line_no, csv_record(header, values), None
+            else:
+                record = json.loads(text)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+                yield line_no, record, None
+        except (ValueError, csv.Error) as e:
+            yield line_no, None, str(e)
+
+
+def _ingest_chunk(chunk_no: int, listings: List[ListingIn], lines: List[int], errors: List[IngestRowError], buyer_id: Optional[str]) -> IngestChunkSummary:
+    try:
+        report = ingest_listings_report(listings, buyer_id=buyer_id) if listings else IngestReport(listings=[])
+    except Exception as e:
+        logger.error("Streamed ingest chunk %d failed: %s", chunk_no, e, exc_info=True)
+        report = IngestReport(listings=[], errors=[
+            IngestRowError(index=i, vin=l.vin, error=f"chunk failed: {e}", retryable=True) for i, l in enumerate(listings)
+        ])
+    # report errors index into this chunk; surface them by source line like parse errors
+    errors = errors + [e.model_copy(update={"index": None, "line": lines[e.index]}) for e in report.errors]
+    errors.sort(key=lambda e: e.line or 0)
+    return IngestChunkSummary(
+        chunk=chunk_no,
+        accepted=len(report.listings),
+        rejected=len(errors),
+        ids=[l.id for l in report.listings],
+        errors=errors,
+    )
+
+
+async def stream_ingest(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    buyer_id: Optional[str] = None,
+    chunk_size: int = 500,
+) -> AsyncIterator[bytes]:
+    """
+    Validate and ingest an NDJSON or CSV upload chunk by chunk, yielding one summary line per chunk.
+
+    Only the current chunk is held in memory. The next chunk of the body is not read until the
+    previous summary has been handed to the server, so a slow reader throttles the upload.
+    """
+    listings: List[ListingIn] = []
+    lines: List[int] = []
+    errors: List[IngestRowError] = []
+    chunk_no = 0
+
+    async for line_no, record, error in iter_records(iter_lines(chunks), fmt):
+        if error is None:
+            try:
+                listings.append(ListingIn.model_validate(record))
+                lines.append(line_no)
+            except ValidationError as e:
+                error = format_validation_error(e)
+        if error is not None:
+            vin = (record or {}).get("vin")
+            errors.append(IngestRowError(line=line_no, vin=vin if isinstance(vin, str) else None, error=error))
+
+        if len(listings) + len(errors) >= chunk_size:
+            chunk_no += 1
+            summary = await run_in_threadpool(_ingest_chunk, chunk_no, listings, lines, errors, buyer_id)
+            listings, lines, errors = [], [], []
+            yield (summary.model_dump_json() + "\n").encode("utf-8")
+
+    if listings or errors or chunk_no == 0:
+        chunk_no += 1
+        summary = await run_in_threadpool(_ingest_chunk, chunk_no, listings, lines, errors, buyer_id)
+        yield (summary.model_dump_json() + "\n").encode("utf-8")
@@ -0,0 +1,62 @@
+"""
+In-memory lookup of the price_comparables table (see api.jobs.price_comparables).
+
+The scorer asks for a baseline once per listing, so lookups are a dict get. The table is loaded
+on first use and reloaded every PRICE_COMPARABLES_RELOAD_SECONDS on a background thread; the
+previous table keeps serving meanwhile, and when a reload fails.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+from ..core.config import settings
+from ..repositories.price_comparables import ComparableKey, load_price_comparables
+
+logger = logging.getLogger(__name__)
+
+
+class PriceComparables:
+    """Median listing price per (make, model, year, mileage band)."""
+    def __init__(self) -> None:
+        self._table: Optional[dict[ComparableKey, float]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._reloading = False
+
+    def replace(self, table: dict[ComparableKey, float]) -> None:
+        self._table = table
+        self._loaded_at = time.monotonic()
+
+    def _reload(self) -> None:
+        try:
+            table = load_price_comparables(settings.PRICE_COMPARABLES_MIN_SAMPLES)
+            if table is not None:
+                self.replace(table)
+                logger.info("Price comparables loaded: %d groups", len(table))
+        finally:
+            self._reloading = False
+
+    def _table_for_lookup(self) -> dict[ComparableKey, float]:
+        if self._table is None:
+            with self._lock:
+                if self._table is None:
+                    self._reloading = True
+                    self._reload()
+                    if self._table is None:
+                        self.replace({})  # retried after the reload interval
+        elif time.monotonic() - self._loaded_at > settings.PRICE_COMPARABLES_RELOAD_SECONDS and not self._reloading:
+            with self._lock:
+                if not self._reloading:
+                    self._reloading = True
+                    threading.Thread(target=self._reload, name="price-comparables-reload", daemon=True).start()
+        return self._table
+
+    def baseline(self, make: Optional[str], model: Optional[str], year: Optional[int], miles: int) -> Optional[float]:
+        """Median price of comparable listings, or None when the group is unknown or too small."""
+        if not (make and model and year):
+            return None
+        key = (make.strip().lower(), model.strip().lower(), year, max(0, miles) // settings.PRICE_COMPARABLES_MILES_BAND)
+        return self._table_for_lookup().get(key)
+
+
+price_comparables = PriceComparables()
@@ -0,0 +1,157 @@
+"""
+Versioned scoring models.
+
+The heuristic in services.score_listing is parameterized by a ScoringModel; the models, which
+one is live and which one (if any) is scored in shadow are read from scoring_models.json:
+
+    {
+      "live": "heuristic-v1",
+      "shadow": "heuristic-v2",
+      "models": [
+        {"version": "heuristic-v1"},
+        {"version": "heuristic-v2", "comparables": true, "buy_max_factor": 1.02}
+      ]
+    }
+
+Parameters left out keep the defaults below, which are the original hard-coded values. A model
+with "comparables" prices listings against the median of comparable listings (see
+services.price_comparables) and falls back to price_pivot when there is none. The file
+is re-read when its mtime changes (checked at most every SCORING_MODELS_RELOAD_SECONDS), so a
+model change needs no restart. A file that fails to parse is logged and the previous models stay
+in use.
+"""
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, ValidationError
+from ..core.config import settings
+from ..schemas.listing import ListingScoreIn
+from .price_comparables import price_comparables
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_VERSION = "heuristic-v1"
+
+
+class ScoringModel(BaseModel):
+    """Parameters of the listing heuristic; calling the model scores one listing."""
+    version: str
+    # base score: weight * linear credit for being under the window
+    dom_weight: float = 40
+    dom_window: int = 30
+    miles_weight: float = 40
+    miles_window: int = 100_000
+    # price boost below the pivot, per step, capped
+    price_pivot: float = 25_000
+    comparables: bool = False  # pivot on the comparables median when the listing has one
+    price_boost_step: float = 1000
+    price_boost_cap: float = 20
+    # reason code thresholds
+    low_dom: int = 20
+    low_miles: int = 50_000
+    aged_dom: int = 45
+    # buy max as a factor of price
+    buy_max_factor: float = 1.03
+    aged_buy_max_factor: float = 0.98
+
+    def pivot(self, item: ListingScoreIn) -> float:
+        """Price below which a listing counts as under its baseline."""
+        if self.comparables:
+            baseline = price_comparables.baseline(item.make, item.model, item.year, item.miles)
+            if baseline is not None:
+                return baseline
+        return self.price_pivot
+
+    def __call__(self, item: ListingScoreIn) -> Tuple[int, float, List[str]]:
+        reasons: list[str] = []
+        dom_penalty = max(0, self.dom_window - item.dom) / self.dom_window
+        miles_penalty = max(0, self.miles_window - item.miles) / self.miles_window
+        base = self.dom_weight * dom_penalty + self.miles_weight * miles_penalty
+
+        pivot = self.pivot(item)
+        price_boost = 0
+        if item.price < pivot:
+            price_boost = min(self.price_boost_cap, (pivot - item.price) / self.price_boost_step)
+            reasons.append("PriceVsBaseline")
+        if item.dom < self.low_dom: reasons.append("LowDOM")
+        if item.miles < self.low_miles: reasons.append("LowMiles")
+
+        score_val = int(max(0, min(100, base + price_boost)))
+        buy_max = max(0.0, item.price * self.buy_max_factor)
+        if item.dom > self.aged_dom:
+            buy_max = item.price * self.aged_buy_max_factor
+            reasons.append("AgedInventory")
+        return score_val, round(buy_max, 2), reasons or ["Heuristic"]
+
+
+class ScoringModelsFile(BaseModel):
+    live: str = DEFAULT_MODEL_VERSION
+    shadow: Optional[str] = None
+    models: List[ScoringModel] = []
+
+
+def _models_path() -> pathlib.Path:
+    if settings.SCORING_MODELS_PATH:
+        return pathlib.Path(settings.SCORING_MODELS_PATH)
+    # repo_root/scoring_models.json
+    return pathlib.Path(__file__).parents[2] / "scoring_models.json"
+
+
+class ScoringModelRegistry:
+    """Live and shadow ScoringModel, hot-reloaded from scoring_models.json."""
+    def __init__(self, path: Optional[pathlib.Path] = None) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._live = ScoringModel(version=DEFAULT_MODEL_VERSION)
+        self._shadow: Optional[ScoringModel] = None
+
+    def _load(self, path: pathlib.Path) -> None:
+        config = ScoringModelsFile.model_validate(json.loads(path.read_text(encoding="utf-8")))
+        by_version = {m.version: m for m in config.models}
+        if config.live not in by_version and config.live != DEFAULT_MODEL_VERSION:
+            raise ValueError(f"live model {config.live!r} is not defined")
+        if config.shadow and config.shadow not in by_version:
+            raise ValueError(f"shadow model {config.shadow!r} is not defined")
+        self._live = by_version.get(config.live) or ScoringModel(version=DEFAULT_MODEL_VERSION)
+        self._shadow = by_version[config.shadow] if config.shadow else None
+        logger.info("Scoring models loaded from %s: live=%s shadow=%s",
+                    path, self._live.version, self._shadow.version if self._shadow else None)
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < settings.SCORING_MODELS_RELOAD_SECONDS and self._checked_at:
+            return
+        with self._lock:
+            self._checked_at = now
+            path = self._path or _models_path()
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                mtime = None
+            if mtime == self._mtime:
+                return
+            self._mtime = mtime
+            if mtime is None:
+                self._live, self._shadow = ScoringModel(version=DEFAULT_MODEL_VERSION), None
+                return
+            try:
+                self._load(path)
+            except (OSError, ValueError, ValidationError) as e:
+                logger.error("Keeping current scoring models; failed to load %s: %s", path, e)
+
+    def live(self) -> ScoringModel:
+        self._refresh()
+        return self._live
+
+    def shadow(self) -> Optional[ScoringModel]:
+        self._refresh()
+        return self._shadow
+
+
+scoring_models = ScoringModelRegistry()
@@ -0,0 +1,258 @@
+"""
+Bulk importer for historical listing files.
+
+    python -m api.tools.import_listings listings.csv
+    python -m api.tools.import_listings archive.ndjson --workers 8 --chunk-size 10000
+    python -m api.tools.import_listings archive.parquet --buyer-id <uuid>   # Parquet needs pyarrow
+
+Rows are validated as ListingIn and normalized exactly like /api/ingest (VIN upper-casing,
+vehicle_key derivation, decision extraction), then loaded through the same COPY-based bulk
+path on several pooled connections in parallel.
+
+Progress is checkpointed to <file>.import-state.json as the number of leading source rows
+whose chunks have committed, with the accepted/rejected totals of those rows. Re-running the
+same command skips that many rows unparsed and resumes; rows of chunks that were in flight (or
+finished out of order) during a crash are loaded again, deduplicated by content hash, and
+counted once.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from ..core.config import settings
+from ..core.db import DB_ENABLED, apply_schema_if_needed
+from ..repositories.repositories import ingest_listings_report
+from ..schemas.ingest import IngestReport, IngestRowError
+from ..schemas.listing import ListingIn
+from ..services.ingest_service import csv_record, format_validation_error
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+CHUNK_RETRIES = 3
+
+
+def _detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    return "ndjson"
+
+
+def iter_file_records(path: str, fmt: str, skip: int = 0) -> Iterator[Tuple[Optional[dict], Optional[str]]]:
+    """
+    Yield (record, error) per data row of a CSV, NDJSON or Parquet file without loading it whole.
+
+    The first `skip` data rows are passed over without being decoded into records.
+    """
+    if fmt == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = [h.strip() for h in next(reader, [])]
+            for values in reader:
+                if not any(values):
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                try:
+                    yield csv_record(header, values), None
+                except ValueError as e:
+                    yield None, str(e)
+    elif fmt == "parquet":
+        if pq is None:
+            raise SystemExit("Parquet import requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches():
+            if skip >= batch.num_rows:
+                skip -= batch.num_rows
+                continue
+            for record in batch.slice(skip).to_pylist():
+                yield record, None
+            skip = 0
+    else:
+        with open(path, encoding="utf-8-sig") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("expected a JSON object")
+                    yield record, None
+                except ValueError as e:
+                    yield None, str(e)
+
+
+def _load_state(state_file: str) -> dict:
+    try:
+        with open(state_file, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"offset": 0, "accepted": 0, "rejected": 0}
+
+
+def _save_state(state_file: str, state: dict) -> None:
+    tmp = f"{state_file}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, state_file)  # atomic, so a crash never leaves a torn checkpoint
+
+
+def _load_chunk(start: int, records: List[Tuple[Optional[dict], Optional[str]]], buyer_id: Optional[str]) -> Tuple[int, int, int, List[IngestRowError]]:
+    """
+    Validate and ingest one chunk. Returns (start, size, accepted, errors) with 0-based file row indexes.
+
+    `buyer_id` is only a fallback for rows without their own; /api/ingest's buyer_id overrides
+    because it is the authenticated user, which an archive import is not.
+    """
+    listings: List[ListingIn] = []
+    positions: List[int] = []
+    errors: List[IngestRowError] = []
+    for i, (record, error) in enumerate(records, start=start):
+        if error is None:
+            try:
+                listing = ListingIn.model_validate(record)
+                if buyer_id and not listing.buyer_id:
+                    listing.buyer_id = buyer_id
+                listings.append(listing)
+                positions.append(i)
+                continue
+            except ValidationError as e:
+                error = format_validation_error(e)
+        vin = (record or {}).get("vin")
+        errors.append(IngestRowError(index=i, vin=vin if isinstance(vin, str) else None, error=error))
+
+    for attempt in range(1, CHUNK_RETRIES + 1):
+        try:
+            report = ingest_listings_report(listings) if listings else IngestReport(listings=[])
+            failure = next((e.error for e in report.errors if e.retryable), None)
+        except Exception as e:
+            failure = str(e)
+        if failure is None:
+            break
+        logger.warning("Chunk at row %d hit a transient failure (attempt %d/%d): %s",
+                       start, attempt, CHUNK_RETRIES, failure)
+        time.sleep(attempt)
+    else:
+        raise RuntimeError(f"chunk at row {start} failed after {CHUNK_RETRIES} attempts")
+
+    errors.extend(e.model_copy(update={"index": positions[e.index]}) for e in report.errors)
+    return start, len(records), len(report.listings), errors
+
+
+def import_file(
+    path: str,
+    fmt: Optional[str] = None,
+    buyer_id: Optional[str] = None,
+    chunk_size: int = 5000,
+    workers: int = 4,
+    state_file: Optional[str] = None,
+    restart: bool = False,
+    rejects_file: Optional[str] = None,
+) -> dict:
+    fmt = fmt or _detect_format(path)
+    state_file = state_file or f"{path}.import-state.json"
+    state = {"offset": 0, "accepted": 0, "rejected": 0} if restart else _load_state(state_file)
+    resume_at = state["offset"]
+    if resume_at:
+        print(f"Resuming {path} at row {resume_at:,}", file=sys.stderr)
+
+    rejects = open(rejects_file, "a", encoding="utf-8") if rejects_file else None
+    # chunk start -> (size, accepted, errors) for chunks done past the watermark; they are
+    # counted, and their rejects written, only once the checkpoint moves over them, because a
+    # crash before that loads them again
+    finished: dict[int, Tuple[int, int, List[IngestRowError]]] = {}
+    started_at = time.time()
+    loaded = 0
+
+    def _complete(future) -> None:
+        nonlocal loaded
+        start, size, accepted, errors = future.result()
+        loaded += size
+        finished[start] = (size, accepted, errors)
+        # advance the checkpoint only across a contiguous run of finished chunks
+        while state["offset"] in finished:
+            size, accepted, errors = finished.pop(state["offset"])
+            state["offset"] += size
+            state["accepted"] += accepted
+            state["rejected"] += len(errors)
+            if rejects:
+                for e in errors:
+                    rejects.write(e.model_dump_json(exclude_none=True) + "\n")
+        if rejects:
+            rejects.flush()  # before the checkpoint that covers them
+        _save_state(state_file, state)
+        rate = loaded / max(time.time() - started_at, 1e-6)
+        print(f"\r{state['offset']:,} rows committed  accepted={state['accepted']:,}  "
+              f"rejected={state['rejected']:,}  {rate:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            chunk: List[Tuple[Optional[dict], Optional[str]]] = []
+            chunk_start = resume_at
+            for item in iter_file_records(path, fmt, skip=resume_at):
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    pending.add(pool.submit(_load_chunk, chunk_start, chunk, buyer_id))
+                    chunk_start, chunk = chunk_start + len(chunk), []
+                    # keep at most two chunks per worker in memory
+                    while len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            _complete(future)
+            if chunk:
+                pending.add(pool.submit(_load_chunk, chunk_start, chunk, buyer_id))
+            for future in wait(pending).done:
+                _complete(future)
+    finally:
+        if rejects:
+            rejects.close()
+        print(file=sys.stderr)
+    return state
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk import listings from CSV, NDJSON or Parquet")
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], default=None, help="default: from file extension")
+    parser.add_argument("--buyer-id", default=None, help="buyer_id stamped on rows that carry none")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per COPY batch")
+    parser.add_argument("--workers", type=int, default=4, help="parallel database connections")
+    parser.add_argument("--state-file", default=None, help="checkpoint path (default: <file>.import-state.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--rejects", default=None, help="append rejected rows as NDJSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    if not DB_ENABLED:
+        raise SystemExit("DATABASE_URL is not configured")
+    if args.workers > settings.DB_POOL_MAX_SIZE:
+        logger.warning("--workers %d exceeds DB_POOL_MAX_SIZE=%d; extra workers will wait for connections",
+                       args.workers, settings.DB_POOL_MAX_SIZE)
+    apply_schema_if_needed()
+
+    state = import_file(
+        args.file, fmt=args.format, buyer_id=args.buyer_id, chunk_size=args.chunk_size,
+        workers=args.workers, state_file=args.state_file, restart=args.restart, rejects_file=args.rejects,
+    )
+    print(f"Done: {state['offset']:,} rows read, {state['accepted']:,} accepted, {state['rejected']:,} rejected")
+
+
+if __name__ == "__main__":
+    main()
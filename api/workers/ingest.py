@@ -0,0 +1,109 @@
+"""
+Ingest job worker.
+
+Drains the ingest_jobs queue filled by /api/ingest?mode=async:
+
+    python -m api.workers.ingest              # poll forever
+    python -m api.workers.ingest --once       # drain what is queued, then exit
+
+Start as many processes as needed; jobs are claimed with FOR UPDATE SKIP LOCKED, so
+workers never block on or double-process each other's jobs. Each chunk commits on its
+own and advances the job's `processed` offset, so a job reclaimed after a crash resumes
+from the last committed chunk.
+"""
+import argparse
+import logging
+import os
+import socket
+import time
+from typing import Optional
+from pydantic import ValidationError
+from ..core.config import settings
+from ..core.db import DB_ENABLED, apply_schema_if_needed
+from ..repositories.ingest_jobs import claim_ingest_job, record_ingest_job_progress, finish_ingest_job
+from ..repositories.repositories import ingest_listings_report
+from ..schemas.ingest import IngestReport, IngestRowError
+from ..schemas.listing import ListingIn
+from ..services.ingest_service import format_validation_error
+from ..services.scoring_models import scoring_models
+
+logger = logging.getLogger(__name__)
+
+
+def process_job(job: dict, chunk_size: int) -> None:
+    rows = job["rows"]
+    offset = job["processed"]
+    while offset < len(rows):
+        chunk = rows[offset:offset + chunk_size]
+        listings: list[ListingIn] = []
+        positions: list[int] = []
+        errors: list[IngestRowError] = []
+        for i, raw in enumerate(chunk, start=offset):
+            try:
+                listings.append(ListingIn.model_validate(raw))
+                positions.append(i)
+            except ValidationError as e:
+                errors.append(IngestRowError(index=i, vin=raw.get("vin"), error=format_validation_error(e)))
+
+        scorer = scoring_models.live() if job["score"] else None
+        report = ingest_listings_report(listings, buyer_id=job["buyer_id"], scorer=scorer) if listings else IngestReport(listings=[])
+        if any(e.retryable for e in report.errors):
+            # connection or commit failure; committed rows are skipped by content hash on retry
+            raise RuntimeError(f"chunk at offset {offset} not fully ingested: {report.errors[0].error}")
+        errors.extend(e.model_copy(update={"index": positions[e.index]}) for e in report.errors)
+        errors.sort(key=lambda e: e.index)
+        accepted = len(report.listings)
+
+        offset += len(chunk)
+        record_ingest_job_progress(job["id"], offset, accepted, errors)
+        logger.info("Job %s: %d/%d rows processed", job["id"], offset, len(rows))
+
+
+def run(once: bool = False, poll_interval: Optional[float] = None, chunk_size: Optional[int] = None) -> int:
+    """Claim and process jobs until the queue is empty (`once`) or forever. Returns jobs processed."""
+    poll_interval = settings.INGEST_WORKER_POLL_SECONDS if poll_interval is None else poll_interval
+    chunk_size = chunk_size or settings.INGEST_JOB_CHUNK_SIZE
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+
+    while True:
+        job = claim_ingest_job(worker, settings.INGEST_JOB_STALE_SECONDS)
+        if job is None:
+            if once:
+                return done
+            time.sleep(poll_interval)
+            continue
+
+        if job["attempts"] > settings.INGEST_JOB_MAX_ATTEMPTS:
+            finish_ingest_job(job["id"], error=f"gave up after {job['attempts'] - 1} attempts")
+            continue
+
+        logger.info("Job %s claimed by %s (attempt %d)", job["id"], worker, job["attempts"])
+        try:
+            process_job(job, chunk_size)
+            finish_ingest_job(job["id"])
+        except Exception as e:
+            logger.error("Job %s failed: %s", job["id"], e, exc_info=True)
+            if job["attempts"] >= settings.INGEST_JOB_MAX_ATTEMPTS:
+                finish_ingest_job(job["id"], error=str(e))
+            # otherwise leave it running; it is reclaimed once its heartbeat goes stale
+        done += 1
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Process queued ingest jobs")
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    parser.add_argument("--poll-interval", type=float, default=None, help="seconds to sleep when idle")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows committed per step")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if not DB_ENABLED:
+        raise SystemExit("DATABASE_URL is not configured")
+    apply_schema_if_needed()
+    processed = run(once=args.once, poll_interval=args.poll_interval, chunk_size=args.chunk_size)
+    logger.info("Worker exiting after %d job(s)", processed)
+
+
+if __name__ == "__main__":
+    main()
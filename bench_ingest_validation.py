@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the /api/ingest validation path (no database involved).
+
+Compares per-row CPU cost of:
+  before - json.loads of the body, validation of the resulting Python objects (what FastAPI does
+           for a List[ListingIn] body), then normalization via model_dump() + dict copy +
+           json.dumps for the payload column
+  after  - TypeAdapter.validate_json on the raw bytes, then normalize_listing(), which reads
+           model attributes directly and serializes the payload with model_dump_json()
+
+Usage: python bench_ingest_validation.py [rows ...]     (default: 10000 100000)
+"""
+import datetime
+import json
+import os
+import sys
+import time
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pydantic import TypeAdapter  # noqa: E402
+from api.repositories.repositories import create_decision_from_data, listing_content_hash, normalize_listing  # noqa: E402
+from api.schemas.listing import ListingIn  # noqa: E402
+
+ADAPTER = TypeAdapter(List[ListingIn])
+
+
+def make_body(rows: int) -> bytes:
+    return json.dumps([
+        {
+            "vin": f"1FTFW1E50PF{i:06d}", "year": 2015 + i % 9, "make": "Ford", "model": "F-150", "trim": "XLT",
+            "price": 25000 + i % 5000, "miles": 10000 + i, "dom": i % 90, "source": "feed", "location": "Dallas, TX",
+            "status": "approved" if i % 3 == 0 else None, "buyMax": 24000 if i % 3 == 0 else None,
+            "reasonCodes": ["PRICE_OK"] if i % 3 == 0 else [],
+        }
+        for i in range(rows)
+    ]).encode("utf-8")
+
+
+def normalize_before(item: ListingIn) -> dict:
+    """The previous normalize_listing: dump to a dict, copy it, and json.dumps the copy."""
+    norm = item.model_dump()
+    vin = norm["vin"].strip().upper() if norm.get("vin") and norm["vin"].strip() else None
+    payload_data = norm.copy()
+    if isinstance(payload_data.get("created_at"), datetime.datetime):
+        payload_data["created_at"] = payload_data["created_at"].isoformat()
+    n = {
+        "vehicle_key": vin, "vin": vin, "year": norm["year"], "make": norm["make"].strip(),
+        "model": norm["model"].strip(), "trim": norm["trim"] or None, "source": norm["source"],
+        "price": norm["price"], "miles": norm["miles"], "dom": norm["dom"], "location": norm.get("location"),
+        "buyer_id": norm.get("buyer_id") or None, "radius": norm.get("radius", 25),
+        "reason_codes": norm.get("reasonCodes", []),
+        "buy_max": float(norm["buyMax"]) if norm.get("buyMax") is not None else None,
+        "status": norm.get("status", ""), "decision": create_decision_from_data(norm),
+        "payload": json.dumps(payload_data),
+    }
+    n["content_hash"] = listing_content_hash(n)
+    return n
+
+
+def before(body: bytes) -> list:
+    return [normalize_before(item) for item in ADAPTER.validate_python(json.loads(body))]
+
+
+def after(body: bytes) -> list:
+    return [normalize_listing(item) for item in ADAPTER.validate_json(body)]
+
+
+def measure(fn, body: bytes, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        fn(body)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main(sizes: List[int]) -> None:
+    print(f"{'rows':>8}  {'before us/row':>14}  {'after us/row':>13}  {'speedup':>7}")
+    for rows in sizes:
+        body = make_body(rows)
+        assert [n["content_hash"] for n in before(body)] == [n["content_hash"] for n in after(body)]
+        b, a = measure(before, body), measure(after, body)
+        print(f"{rows:>8}  {b / rows * 1e6:>14.2f}  {a / rows * 1e6:>13.2f}  {b / a:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for turning listing rows into response bytes (no database involved).
+
+Compares per-row CPU cost of:
+  before - the previous row mapper (Decimal/int conversions, create_decision_from_data over the
+           whole payload, a validated ListingOut) followed by what FastAPI does for
+           response_model=List[ListingOut]: dump each model, validate the dicts again,
+           jsonable_encoder, json.dumps
+  after  - _listing_out_from_row (typed SQL columns, model_construct) and a single
+           TypeAdapter(List[ListingOut]).dump_json
+
+Usage: python bench_listing_serialization.py [rows ...]     (default: 10000 100000)
+"""
+import datetime
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from api.repositories.repositories import _listing_out_from_row, create_decision_from_data  # noqa: E402
+from api.schemas.listing import ListingOut  # noqa: E402
+
+ADAPTER = TypeAdapter(List[ListingOut])
+
+
+def _payload(i: int) -> dict:
+    return {
+        "id": None, "vin": f"1FTFW1E50PF{i:06d}", "year": 2019, "make": "Ford", "model": "F-150", "trim": "XLT",
+        "price": 25000.0 + i, "miles": 10000 + i, "dom": i % 90, "source": "feed", "location": "Dallas, TX",
+        "radius": 25, "buyer_id": None, "decision": None, "created_at": "2026-01-01T00:00:00+00:00",
+        "status": "approved" if i % 3 == 0 else None, "buyMax": 24000.0 if i % 3 == 0 else None,
+        "reasonCodes": ["PRICE_OK"] if i % 3 == 0 else [],
+    }
+
+
+def old_rows(n: int) -> list:
+    """Rows in the shape the previous SELECT returned (numeric as Decimal, whole payload as dict)."""
+    created = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    return [
+        (i, f"VK{i}", f"VIN{i}", 2019, "Ford", "F-150", "XLT", 10000 + i, Decimal(25000 + i), i % 90, "feed",
+         "Dallas, TX", "buyer-1", "buyer", 80, Decimal("24000.50"), ["LowDOM"], created, _payload(i))
+        for i in range(n)
+    ]
+
+
+def new_rows(n: int) -> list:
+    """Rows in the shape _LISTING_PAGE_COLUMNS returns (typed in SQL, decision fields extracted)."""
+    out = []
+    for i in range(n):
+        p = _payload(i)
+        out.append((
+            str(i), f"VK{i}", f"VIN{i}", 2019, "Ford", "F-150", "XLT", 10000 + i, float(25000 + i), i % 90, "feed",
+            "Dallas, TX", "buyer-1", "buyer", 80, 24000.5, ["LowDOM"], True, p["status"], p["reasonCodes"], p["buyMax"],
+        ))
+    return out
+
+
+def old_listing_out(row: tuple) -> ListingOut:
+    (rid, vehicle_key, vin, year, make, model, trim, miles, price, dom, source, location, buyer_id,
+     buyer_username, score, buy_max, reason_codes, created_at, payload) = row
+    payload_data = json.loads(payload) if isinstance(payload, str) else payload
+    return ListingOut(
+        id=str(rid), vehicle_key=vehicle_key, vin=vin or "", year=int(year), make=make, model=model, trim=trim,
+        miles=int(miles), price=float(price), dom=int(dom), source=source,
+        location=location, buyer_id=buyer_id, buyer_username=buyer_username,
+        radius=25, reasonCodes=reason_codes or [],
+        buyMax=float(buy_max) if buy_max is not None else None,
+        status=payload_data.get("status", ""), score=int(score) if score is not None else None,
+        decision=create_decision_from_data(payload_data),
+    )
+
+
+def before(rows: list) -> bytes:
+    items = [old_listing_out(row) for row in rows]
+    validated = ADAPTER.validate_python([item.model_dump() for item in items])
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def after(rows: list) -> bytes:
+    return ADAPTER.dump_json([_listing_out_from_row(row) for row in rows])
+
+
+def measure(fn, rows: list, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        fn(rows)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main(sizes: List[int]) -> None:
+    print(f"{'rows':>8}  {'before us/row':>14}  {'after us/row':>13}  {'speedup':>7}")
+    for n in sizes:
+        old, new = old_rows(n), new_rows(n)
+        assert json.loads(before(old[:50]))[3]["decision"] == json.loads(after(new[:50]))[3]["decision"]
+        b, a = measure(before, old), measure(after, new)
+        print(f"{n:>8}  {b / n * 1e6:>14.2f}  {a / n * 1e6:>13.2f}  {b / a:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
@@ -18,6 +18,12 @@ create table if not exists listings (
   location text,
   buyer_id text,
   payload jsonb,
+  -- decision fields of the payload, as typed columns
+  status text,
+  decision_buy_max numeric,
+  decision_reasons text[],
+  content_hash text,
+  last_seen_at timestamptz default now(),
   created_at timestamptz default now()
 );
 
@@ -28,21 +34,142 @@ create table if not exists scores (
   score int check (score between 0 and 100),
   buy_max numeric,
   reason_codes text[],
+  model_version text,
+  -- inputs the score was computed from (NULL for placeholder rows from feed decisions)
+  price numeric,
+  miles int,
+  dom int,
+  -- price baseline the score was computed against (float8 so the memo compares it exactly)
+  pivot double precision,
+  created_at timestamptz default now()
+);
+
+-- Candidate-model results computed alongside the live model (see api/services/scoring_models.py)
+create table if not exists scores_shadow (
+  id bigserial primary key,
+  vehicle_key text,
+  vin text,
+  model_version text not null,
+  score int,
+  buy_max numeric,
+  reason_codes text[],
+  live_model_version text,
+  live_score int,
   created_at timestamptz default now()
 );
 
+-- Latest score per VIN, kept current by the scores_latest_sync trigger (see api/core/db.py)
+create table if not exists scores_latest (
+  vin text primary key,
+  vehicle_key text,
+  score int,
+  buy_max numeric,
+  reason_codes text[],
+  created_at timestamptz,
+  score_id int,
+  model_version text,
+  price numeric,
+  miles int,
+  dom int,
+  pivot double precision
+);
+
 create or replace view v_latest_scores as
 select distinct on (vehicle_key) vehicle_key, vin, score, buy_max, reason_codes, created_at
-from scores
+from scores_latest
 order by vehicle_key, created_at desc;
 
+-- One-time data migrations already applied by apply_schema_if_needed
+create table if not exists schema_migrations (
+  name text primary key,
+  applied_at timestamptz default now()
+);
+
+-- Write counter behind the ETags of listing/KPI reads, bumped by the data_version_bump triggers
+-- (see api/core/db.py). Sharded by backend so concurrent writers do not queue on one row;
+-- the version is sum(version), which grows with every committed write.
+create table if not exists data_versions (
+  shard int primary key,
+  version bigint not null default 0
+);
+
 -- Add indexes for better performance
 create index if not exists idx_listings_vehicle_key on listings(vehicle_key);
 create index if not exists idx_listings_vin on listings(vin);
+-- Keyset pagination: newest-first pages and the newest-row-per-vehicle anti-join
+create index if not exists idx_listings_created_at_id on listings(created_at desc, id desc);
+create index if not exists idx_listings_vehicle_key_created on listings(vehicle_key, created_at desc, id desc);
+-- Listing filters and sorts (expressions match _LISTING_SORT_KEYS / _listing_filter_sql)
+create index if not exists idx_listings_price_id on listings((coalesce(price, 0)), id);
+create index if not exists idx_listings_miles_id on listings((coalesce(miles, 0)), id);
+create index if not exists idx_listings_source_created on listings(source, created_at desc, id desc);
+create index if not exists idx_vehicles_make_model_year on vehicles(lower(make), lower(model), year);
+-- year-only filters, which cannot use the make/model/year index
+create index if not exists idx_vehicles_year on vehicles(year);
 create index if not exists idx_scores_vehicle_key on scores(vehicle_key);
 create index if not exists idx_scores_vin on scores(vin);
+create index if not exists idx_scores_latest_vehicle_key on scores_latest(vehicle_key);
+create index if not exists idx_scores_latest_score on scores_latest(score);
+create index if not exists idx_scores_shadow_model_created on scores_shadow(model_version, created_at);
 create index if not exists idx_vehicles_vin on vehicles(vin);
 
+-- Durable queue for asynchronous ingest (/api/ingest?mode=async), drained by api.workers.ingest
+create table if not exists ingest_jobs (
+  id uuid primary key default gen_random_uuid(),
+  status text not null default 'queued' check (status in ('queued', 'running', 'done', 'failed')),
+  buyer_id text,
+  payload jsonb not null,
+  score boolean not null default false,
+  total int not null default 0,
+  processed int not null default 0,
+  accepted int not null default 0,
+  rejected int not null default 0,
+  errors jsonb not null default '[]'::jsonb,
+  attempts int not null default 0,
+  worker text,
+  last_error text,
+  created_at timestamptz default now(),
+  started_at timestamptz,
+  heartbeat_at timestamptz,
+  finished_at timestamptz
+);
+
+-- Price percentiles of active listings per (make, model, year, mileage band), maintained by
+-- api.jobs.price_comparables and read by the scorer as its PriceVsBaseline pivot.
+-- make and model are lower-cased and miles_band is miles / PRICE_COMPARABLES_MILES_BAND.
+create table if not exists price_comparables (
+  make text not null,
+  model text not null,
+  year int not null,
+  miles_band int not null,
+  n int not null,
+  p25 numeric,
+  p50 numeric,
+  p75 numeric,
+  refreshed_at timestamptz default now(),
+  primary key (make, model, year, miles_band)
+);
+
+-- Resume points and watermarks of background jobs (api.jobs.*), keyed by job name
+create table if not exists job_cursors (
+  name text primary key,
+  last_id bigint not null default 0,
+  updated_at timestamptz default now()
+);
+
+-- Responses of batches sent with an Idempotency-Key header, replayed on retries
+create table if not exists ingest_idempotency_keys (
+  key text not null,
+  buyer_id text not null default '',
+  status_code int not null,
+  response jsonb not null,
+  created_at timestamptz default now(),
+  primary key (key, buyer_id)
+);
+
+create index if not exists idx_ingest_idempotency_created_at on ingest_idempotency_keys(created_at);
+create index if not exists idx_ingest_jobs_pending on ingest_jobs(created_at) where status in ('queued', 'running');
+
 -- User authentication and management
 
 -- Roles table for scalable role management
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Idempotency-Key test for /api/ingest
+A response with retryable row errors is not stored, so a retry under the same key ingests the rows
+"""
+
+import os
+import sys
+from uuid import uuid4
+
+# Add the api directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'api'))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.core.auth import get_current_user
+from api.routes import routes
+from api.schemas.ingest import IngestReport, IngestRowError
+from api.schemas.listing import ListingOut
+from api.schemas.user import UserOut
+
+ROWS = [
+    {"vin": f"IDEMP{i:012d}", "year": 2019, "make": "Ford", "model": "F150", "price": 20_000 + i, "miles": 1000, "dom": 3}
+    for i in range(3)
+]
+
+class FlakyStore:
+    """ingest_listings_report stand-in: the first call loses its chunk to a dropped connection"""
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, listings, buyer_id=None, scorer=None):
+        self.calls += 1
+        if self.calls == 1:
+            return IngestReport(listings=[], errors=[
+                IngestRowError(index=i, vin=l.vin, error="database unavailable", retryable=True)
+                for i, l in enumerate(listings)
+            ])
+        return IngestReport(listings=[
+            ListingOut(id=str(i + 1), vehicle_key=l.vin, vin=l.vin, year=l.year, make=l.make, model=l.model,
+                       miles=l.miles, price=l.price, dom=l.dom, buyer_id=buyer_id)
+            for i, l in enumerate(listings)
+        ])
+
+def make_client(monkeypatch, store):
+    stored = {}
+    monkeypatch.setattr(routes, "ingest_listings_report", store)
+    monkeypatch.setattr(routes, "get_idempotent_response", lambda key, buyer_id: stored.get((key, buyer_id)))
+    monkeypatch.setattr(routes, "store_idempotent_response",
+                        lambda key, buyer_id, status_code, body: stored.__setitem__((key, buyer_id), (status_code, body)))
+    app = FastAPI()
+    app.include_router(routes.ingest_router, prefix="/api")
+    user_id = uuid4()
+    app.dependency_overrides[get_current_user] = lambda: UserOut.model_construct(
+        id=user_id, email="buyer@example.com", username="buyer", role="buyer", role_id=2, is_confirmed=True,
+    )
+    return TestClient(app), stored
+
+def test_retry_after_retryable_failure_ingests_under_same_key(monkeypatch):
+    """The failed attempt is not replayed; the retry reaches the store and its success is what gets replayed"""
+    store = FlakyStore()
+    client, stored = make_client(monkeypatch, store)
+    headers = {"Idempotency-Key": "batch-1"}
+
+    first = client.post("/api/ingest", json=ROWS, headers=headers)
+    assert first.status_code == 200
+    assert all(e["retryable"] for e in first.json()["errors"])
+    assert not stored
+
+    retry = client.post("/api/ingest", json=ROWS, headers=headers)
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+    assert [l["vin"] for l in retry.json()["listings"]] == [r["vin"] for r in ROWS]
+    assert store.calls == 2
+
+    replay = client.post("/api/ingest", json=ROWS, headers=headers)
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json() == retry.json()
+    assert store.calls == 2
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))